@@ -2,6 +2,10 @@
 import pandas as pd
 import numpy as np
 import os
+import glob
+import hashlib
+
+import schema
 
 # visualization imports
 import matplotlib.pyplot as plt
@@ -9,29 +13,387 @@ import seaborn as sns
 sns.set()
 
 
+# columns retained in the bachelor degree table
+# -------------------------------------------- #
+
+BACH_COLUMNS = [
+    "UNITID",
+    "INSTNM_x",
+    "CONTROL_x",
+    "STABBR",
+    "ZIP",
+    "CITY",
+    "REGION",
+    "OPEFLAG",
+    "PREDDEG",
+    "SCH_DEG",
+    "CREDDESC",
+    "CREDLEV",
+    "CIPCODE",
+    "CIPDESC",
+    "NUMBRANCH",
+    "NPT4_PUB",
+    "NPT4_PRIV",
+    "NPT4_PROG",
+    "NPT4_OTHER",
+    "NUM4_PRIV",
+    "NUM41_PUB",
+    "NUM41_PRIV",
+    "NUM41_PROG",
+    "NUM41_OTHER",
+    "NUM42_PUB",
+    "NUM42_PRIV",
+    "NUM42_PROG",
+    "NUM42_OTHER",
+    "NUM43_PUB",
+    "NUM43_PRIV",
+    "NUM43_PROG",
+    "NUM43_OTHER",
+    "NUM44_PUB",
+    "NUM44_PRIV",
+    "NUM44_PROG",
+    "NUM44_OTHER",
+    "NUM45_PUB",
+    "NUM45_PRIV",
+    "NUM45_PROG",
+    "NUM45_OTHER",
+    "TUITFTE",
+    "ROOMBOARD_OFF",
+    "ROOMBOARD_ON",
+    "ADM_RATE",
+    "GRADS",
+    "ACTCMMID",
+    "SAT_AVG",
+    "ADMCON7",
+    "AVGFACSAL",
+    "DISTANCEONLY",
+    "C150_4",
+    "C150_4_2MOR",
+    "C150_4_AIAN",
+    "C150_4_ASIAN",
+    "C150_4_BLACK",
+    "C150_4_HISP",
+    "C150_4_NRA",
+    "C150_4_UNKN",
+    "C150_4_WHITE",
+    "PFTFTUG1_EF",
+    "PPTUG_EF",
+    "RET_FT4",
+    "RET_PT4",
+    "UGDS_2MOR",
+    "UGDS_AIAN",
+    "UGDS_ASIAN",
+    "UGDS_BLACK",
+    "UGDS_HISP",
+    "UGDS_NHPI",
+    "UGDS_NRA",
+    "UGDS_UNKN",
+    "UGDS_WHITE",
+    "D_PCTPELL_PCTFLOAN",
+    "DEBT_MDN",
+    "PELL_DEBT_MDN",
+    "LO_INC_DEBT_MDN",
+    "MD_INC_DEBT_MDN",
+    "HI_INC_DEBT_MDN",
+    "GRAD_DEBT_MDN",
+    "WDRAW_DEBT_MDN",
+    "MALE_DEBT_MDN",
+    "FEMALE_DEBT_MDN",
+    "IND_DEBT_MDN",
+    "FIRSTGEN_DEBT_MDN",
+    "NOTFIRSTGEN_DEBT_MDN",
+    "NOPELL_DEBT_MDN",
+    "FTFTPCTFLOAN",
+    "FTFTPCTPELL",
+    "DEBT_PELL_PP_EVAL_MDN",
+    "DEBT_PELL_PP_EVAL_MEAN",
+    "DEBT_PELL_STGP_EVAL_MDN",
+    "DEBT_PELL_STGP_EVAL_MEAN",
+    "DEBT_ALL_PP_EVAL_MDN",
+    "DEBT_ALL_PP_EVAL_MEAN",
+    "DEBT_ALL_STGP_EVAL_MDN",
+    "DEBT_ALL_STGP_EVAL_MEAN",
+    "DEBT_ALL_STGP_EVAL_MDN10YRPAY",
+    "DEBT_NOPELL_STGP_EVAL_MDN",
+    "DEBT_NOPELL_STGP_EVAL_MEAN",
+    "DEBT_ALL_PP_EVAL_MDN10YRPAY",
+    "PCIP01",
+    "PCIP03",
+    "PCIP04",
+    "PCIP05",
+    "PCIP09",
+    "PCIP10",
+    "PCIP11",
+    "PCIP12",
+    "PCIP13",
+    "PCIP14",
+    "PCIP15",
+    "PCIP16",
+    "PCIP19",
+    "PCIP22",
+    "PCIP23",
+    "PCIP24",
+    "PCIP25",
+    "PCIP26",
+    "PCIP27",
+    "PCIP29",
+    "PCIP30",
+    "PCIP31",
+    "PCIP38",
+    "PCIP39",
+    "PCIP40",
+    "PCIP41",
+    "PCIP42",
+    "PCIP43",
+    "PCIP44",
+    "PCIP45",
+    "PCIP46",
+    "PCIP47",
+    "PCIP48",
+    "PCIP49",
+    "PCIP50",
+    "PCIP51",
+    "PCIP52",
+    "PCIP54",
+    "UGNONDS"
+]
+
+
+# compact dtypes for the projected read of each source table
+# -------------------------------------------- #
+
+# markers the Scorecard files use for missing/suppressed entries
+SUPPRESSED_VALUES = schema.null_values()
+
+# program-level columns pulled from the field of study table
+FIELD_OF_STUDY_COLUMNS = [
+    "UNITID",
+    "INSTNM",
+    "CONTROL",
+    "CREDLEV",
+    "CREDDESC",
+    "CIPCODE",
+    "CIPDESC",
+    "DEBT_PELL_PP_EVAL_MDN",
+    "DEBT_PELL_PP_EVAL_MEAN",
+    "DEBT_PELL_STGP_EVAL_MDN",
+    "DEBT_PELL_STGP_EVAL_MEAN",
+    "DEBT_ALL_PP_EVAL_MDN",
+    "DEBT_ALL_PP_EVAL_MEAN",
+    "DEBT_ALL_STGP_EVAL_MDN",
+    "DEBT_ALL_STGP_EVAL_MEAN",
+    "DEBT_ALL_STGP_EVAL_MDN10YRPAY",
+    "DEBT_NOPELL_STGP_EVAL_MDN",
+    "DEBT_NOPELL_STGP_EVAL_MEAN",
+    "DEBT_ALL_PP_EVAL_MDN10YRPAY"
+]
+
+# every other bachelor column comes from the institution table
+INSTITUTION_COLUMNS = ["UNITID"] + [
+    col for col in BACH_COLUMNS
+    if col not in FIELD_OF_STUDY_COLUMNS and col not in ("INSTNM_x", "CONTROL_x")
+]
+
+# where the published csv (or our use of a code) differs from the data dictionary
+FIELD_OF_STUDY_OVERRIDES = {
+    "UNITID": "Int32",
+    "CONTROL": "category",
+    "CIPCODE": "Int16"
+}
+
+INSTITUTION_OVERRIDES = {
+    "UNITID": "Int32",
+    "REGION": "Int8",
+    "OPEFLAG": "Int8",
+    "SCH_DEG": "Int8",
+    "NUMBRANCH": "Int16",
+    "DISTANCEONLY": "Int8",
+    "NPT4_PUB": "float32",
+    "NPT4_PRIV": "float32"
+}
+
+FIELD_OF_STUDY_DTYPES = schema.get_dtypes(FIELD_OF_STUDY_COLUMNS, "program", FIELD_OF_STUDY_OVERRIDES)
+
+INSTITUTION_DTYPES = schema.get_dtypes(INSTITUTION_COLUMNS, "institution", INSTITUTION_OVERRIDES)
+
+# dtypes of the finished bachelor table (field of study names carry the merge suffix)
+BACH_DTYPES = {
+    **{f"{col}_x" if col in ("INSTNM", "CONTROL") else col: dtype for col, dtype in FIELD_OF_STUDY_DTYPES.items()},
+    **INSTITUTION_DTYPES
+}
+
+# columns published with `PrivacySuppressed` in place of small-cell values
+SUPPRESSIBLE_COLUMNS = (
+    schema.get_suppressible(FIELD_OF_STUDY_COLUMNS, "program") 
+    + schema.get_suppressible(INSTITUTION_COLUMNS, "institution"))
+
+
+# fingerprinted columnar cache
+# -------------------------------------------- #
+
+# the two College Scorecard source tables for period 2018-2019
+SOURCE_FILES = ["FieldOfStudyData1718_1819_PP.csv", "MERGED2018_19_PP.csv"]
+
+# bump when the filtering/selection logic of a cached table changes
+CACHE_VERSION = 1
+
+
+def get_selection_key(selection):
+
+    '''Function that keys the logic used to select a cached table, so each 
+    selection (e.g. projected vs full-width) keeps its own cache files.'''
+
+    return hashlib.sha1(repr((CACHE_VERSION, selection)).encode()).hexdigest()[:8]
+
+
+def get_fingerprint(filenames, selection):
+
+    '''Function that fingerprints the source files (name, size and 
+    modification time) together with the logic used to select from them, 
+    as "<selection key>_<source hash>".
+
+    Any change to either produces a new fingerprint, so stale caches 
+    are never read.'''
+
+    h = hashlib.sha1()
+
+    for filename in filenames:
+        stat = os.stat(filename)
+        h.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    return f"{get_selection_key(selection)}_{h.hexdigest()[:16]}"
+
+
+def get_cached_filename(name, filenames, selection, ext = "parquet"):
+
+    '''Function that returns the cache file for the `name` table under the 
+    current fingerprint of its sources and selection logic.
+
+    If the source files are not available locally, the newest cache of the 
+    table built with the same selection is used as-is; caches of other 
+    selections are never substituted.'''
+
+    if all(os.path.isfile(filename) for filename in filenames):
+        return f"{name}_{get_fingerprint(filenames, selection)}.{ext}"
+
+    cached = sorted(glob.glob(f"{name}_{get_selection_key(selection)}_*.{ext}"), key = os.path.getmtime)
+
+    if not cached:
+        raise FileNotFoundError(f"no cached {name} for this selection and source files {filenames} not found")
+
+    print(f"source files not found, using cached {cached[-1]}")
+
+    return cached[-1]
+
+
+def read_cached_table(name, filenames, selection, columns = None):
+
+    '''Function that returns the cached `name` table when its fingerprint 
+    matches the current source files, or None if it has to be rebuilt.
+
+    `columns` reads only a subset of the cached columns.'''
+
+    filename = get_cached_filename(name, filenames, selection)
+
+    if not os.path.isfile(filename):
+        return None
+
+    return pd.read_parquet(filename, columns = columns)
+
+
+def write_cached_table(df, name, filenames, selection, masks = None):
+
+    '''Function that caches a table as compressed parquet under the 
+    fingerprint of its sources and selection logic, removing stale copies 
+    of the same selection (other selections' caches are kept).
+
+    Packed suppression masks, if passed, are cached alongside as .npz.'''
+
+    filename = f"{name}_{get_fingerprint(filenames, selection)}"
+
+    for stale in glob.glob(f"{name}_{get_selection_key(selection)}_*"):
+        if not stale.startswith(filename):
+            os.remove(stale)
+
+    df.to_parquet(f"{filename}.parquet", compression = "zstd")
+
+    if masks is not None:
+        np.savez_compressed(f"{filename}.npz", **masks)
+
+
+# parse-time privacy suppression handling
+# -------------------------------------------- #
+
+def split_suppressed(df, columns):
+
+    '''Function that converts suppressible text columns to float32, 
+    returning the converted df and a bit-packed mask per column marking 
+    the rows that were `PrivacySuppressed` (as opposed to missing).
+
+    Masks are positional: they follow the row order of the passed df.'''
+
+    masks = {"__rows__": np.array([len(df)])}
+
+    converted = {}
+
+    for col in columns:
+
+        values = df[col]
+
+        suppressed = (values == "PrivacySuppressed").to_numpy(dtype = bool, na_value = False)
+
+        masks[col] = np.packbits(suppressed)
+
+        converted[col] = pd.to_numeric(values.mask(suppressed), errors = "coerce").astype("float32")
+
+    df = df.assign(**converted)
+
+    return df, masks
+
+
+def get_parse_options(dtypes):
+
+    '''Function that returns the `pd.read_csv` projection/typing options 
+    for the passed {column: dtype} mapping.
+
+    Suppressible columns are parsed as text so the marker can be told apart 
+    from NULL; every other column reads both markers as null.'''
+
+    parse_dtypes = {col: str if col in SUPPRESSIBLE_COLUMNS else dtype for col, dtype in dtypes.items()}
+
+    na_values = {col: ["NULL"] if col in SUPPRESSIBLE_COLUMNS else SUPPRESSED_VALUES for col in dtypes}
+
+    return dict(usecols = list(dtypes), dtype = parse_dtypes, na_values = na_values)
+
+
+def unpack_suppression_masks(masks, columns = None):
+
+    '''Function that unpacks bit-packed suppression masks into 
+    {column: boolean array}.'''
+
+    n_rows = int(masks["__rows__"][0])
+
+    columns = columns or [col for col in masks if col != "__rows__"]
+
+    return {col: np.unpackbits(masks[col], count = n_rows).astype(bool) for col in columns}
+
+
 # initial acquisition functions
 # -------------------------------------------- #
 
-def get_majors_df():
+def get_majors_df(columns = None):
 
     '''Function to initially pull and merge the two (2) needed 
-    College Scorecard tables for period 2018-2019.'''
-
-    # checking if dataset exists
-    filename = "majors_table.csv"
-    
-    if os.path.isfile(filename):
-        
-        df = pd.read_csv(filename, index_col = True)
+    College Scorecard tables for period 2018-2019.
 
-        print(f"dataframe shape: {df.shape}")
+    The merged table is cached as parquet; `columns` reads only a subset.'''
 
-        return df
+    # checking if an up to date cache exists
+    df = read_cached_table("majors_table", SOURCE_FILES, "majors", columns)
 
-    else:
+    if df is None:
         # checks local foldere for following files
-        filename_01 = "FieldOfStudyData1718_1819_PP.csv"
-        filename_02 = "MERGED2018_19_PP.csv"
+        filename_01, filename_02 = SOURCE_FILES
         
         # created the necessary parent and child tables
         df_parent = pd.read_csv(filename_01, low_memory=False)
@@ -46,40 +408,95 @@ def get_majors_df():
         on = "UNITID",
         copy = False
         )
-        # cache the newly created dataframe as a .csv file
-        df.to_csv("majors_table.csv")
-        # print the df shape
-        print(f"dataframe shape: {df.shape}")
+        # cache the newly created dataframe
+        write_cached_table(df, "majors_table", SOURCE_FILES, "majors")
+
+        if columns is not None:
+            df = df[columns]
+
+    # print the df shape
+    print(f"dataframe shape: {df.shape}")
+
+    # return the dataframe
+    return df
+
+
+def read_projected_bach_df(filename_01, filename_02):
+
+    '''Function that builds the bachelor degree table by parsing only the 
+    needed columns of each College Scorecard table, with compact dtypes.
+
+    Bachelor records are filtered before the merge, so the institution table 
+    is only joined onto the rows that are kept. Suppressible columns are 
+    parsed as text and converted by `split_suppressed`, so the df is returned 
+    together with their packed suppression masks.'''
+
+    # program-level parent table, projected and typed at parse time
+    df_parent = pd.read_csv(filename_01, **get_parse_options(FIELD_OF_STUDY_DTYPES))
+
+    # filters for just bachelor specific records
+    df_parent = df_parent[df_parent["CREDDESC"] == "Bachelors Degree"]
+
+    # institution-level child table, projected and typed at parse time
+    df_child = pd.read_csv(filename_02, **get_parse_options(INSTITUTION_DTYPES))
+
+    df = df_parent.merge(
+        df_child,
+        how = "left",
+        on = "UNITID"
+        )
+
+    # keep the merge-suffixed names of the full-width table
+    df = df.rename(columns = {"INSTNM": "INSTNM_x", "CONTROL": "CONTROL_x"})
+
+    # return the dataframe in the bachelor table column order
+    return split_suppressed(df[BACH_COLUMNS], SUPPRESSIBLE_COLUMNS)
+
+
+def get_bach_selection(projected = True):
 
-        # return the dataframe
-        return df
+    '''Function that returns the selection logic the bachelor table cache 
+    is keyed on: the retained columns and how they were parsed.'''
 
+    return ("bach", projected, BACH_COLUMNS, sorted(map(str, BACH_DTYPES.items())), SUPPRESSIBLE_COLUMNS)
 
-def get_bach_df():
+
+def get_bach_df(projected = True, columns = None):
 
     '''Function to initial check for a bachelor degree table.
     
     If the table is not found, then it checks for the initially needed 
     College Scorecard tables for period 2018-2019.
     
-    The function then filters, saves, and returns bachelor degree records.'''
+    The function then filters, saves, and returns bachelor degree records.
 
-    # checking if dataset exists
-    filename = "bach_table.csv"
-    
-    if os.path.isfile(filename):
-        
-        df = pd.read_csv(filename, index_col = 0)
+    By default only the bachelor table columns are parsed from the source 
+    files (see `read_projected_bach_df`); pass `projected = False` to read 
+    and merge the full-width tables instead. The table is cached as parquet 
+    and `columns` reads only a subset of it.
 
-        print(f"dataframe shape: {df.shape}")
+    Privacy-suppressed entries arrive as NaN; use `get_suppression_masks` 
+    to tell them apart from values that were simply missing.'''
 
-        return df
+    selection = get_bach_selection(projected)
 
-    else:
+    # checking if an up to date cache exists
+    bach_df = read_cached_table("bach_table", SOURCE_FILES, selection, columns)
 
-        # checks local foldere for following files
-        filename_01 = "FieldOfStudyData1718_1819_PP.csv"
-        filename_02 = "MERGED2018_19_PP.csv"
+    if bach_df is not None:
+
+        print(f"dataframe shape: {bach_df.shape}")
+
+        return bach_df
+
+    # checks local foldere for following files
+    filename_01, filename_02 = SOURCE_FILES
+
+    if projected:
+
+        bach_df, masks = read_projected_bach_df(filename_01, filename_02)
+
+    else:
         
         # created the necessary parent and child tables
         df_parent = pd.read_csv(filename_01, low_memory=False)
@@ -99,154 +516,33 @@ def get_bach_df():
         bach_df = df[df["CREDDESC"] == "Bachelors Degree"]
 
         # # initial filter of columns with >= 50% missing records
-        bach_df = bach_df[[ 
-                "UNITID",
-                "INSTNM_x",
-                "CONTROL_x",
-                "STABBR",
-                "ZIP",
-                "CITY",
-                "REGION",
-                "OPEFLAG",
-                "PREDDEG",
-                "SCH_DEG",
-                "CREDDESC",
-                "CREDLEV",
-                "CIPCODE",
-                "CIPDESC",
-                "NUMBRANCH",
-                "NPT4_PUB",
-                "NPT4_PRIV",
-                "NPT4_PROG",
-                "NPT4_OTHER",
-                "NUM4_PRIV",
-                'NUM41_PUB',
-                'NUM41_PRIV',
-                'NUM41_PROG',
-                'NUM41_OTHER',
-                'NUM42_PUB',
-                'NUM42_PRIV',
-                'NUM42_PROG',
-                'NUM42_OTHER',
-                'NUM43_PUB',
-                'NUM43_PRIV',
-                'NUM43_PROG',
-                'NUM43_OTHER',
-                'NUM44_PUB',
-                'NUM44_PRIV',
-                'NUM44_PROG',
-                'NUM44_OTHER',
-                'NUM45_PUB',
-                'NUM45_PRIV',
-                'NUM45_PROG',
-                'NUM45_OTHER',
-                "TUITFTE",
-                "ROOMBOARD_OFF",
-                "ROOMBOARD_ON",
-                "ADM_RATE",
-                "GRADS",
-                "ACTCMMID",
-                "SAT_AVG",
-                "ADMCON7",
-                "AVGFACSAL",
-                "DISTANCEONLY",
-                "C150_4",
-                "C150_4_2MOR",
-                "C150_4_AIAN",
-                "C150_4_ASIAN",
-                "C150_4_BLACK",
-                "C150_4_HISP",
-                "C150_4_NRA",
-                "C150_4_UNKN",
-                "C150_4_WHITE",
-                "PFTFTUG1_EF",
-                "PPTUG_EF",
-                "RET_FT4",
-                "RET_PT4",
-                "UGDS_2MOR",
-                "UGDS_AIAN",
-                "UGDS_ASIAN",
-                "UGDS_BLACK",
-                "UGDS_HISP",
-                "UGDS_NHPI",
-                "UGDS_NRA",
-                "UGDS_UNKN",
-                "UGDS_WHITE",
-                "D_PCTPELL_PCTFLOAN",
-                "DEBT_MDN",
-                "PELL_DEBT_MDN",
-                "LO_INC_DEBT_MDN",
-                "MD_INC_DEBT_MDN",
-                "HI_INC_DEBT_MDN",
-                "GRAD_DEBT_MDN",
-                "WDRAW_DEBT_MDN",
-                "MALE_DEBT_MDN",
-                "FEMALE_DEBT_MDN",
-                "IND_DEBT_MDN",
-                "FIRSTGEN_DEBT_MDN",
-                "NOTFIRSTGEN_DEBT_MDN",
-                "NOPELL_DEBT_MDN",
-                "FTFTPCTFLOAN",
-                "FTFTPCTPELL",
-                "DEBT_PELL_PP_EVAL_MDN",
-                "DEBT_PELL_PP_EVAL_MEAN",
-                "DEBT_PELL_STGP_EVAL_MDN",
-                "DEBT_PELL_STGP_EVAL_MEAN",
-                "DEBT_ALL_PP_EVAL_MDN",
-                "DEBT_ALL_PP_EVAL_MEAN",
-                "DEBT_ALL_STGP_EVAL_MDN",
-                "DEBT_ALL_STGP_EVAL_MEAN",
-                "DEBT_ALL_STGP_EVAL_MDN10YRPAY",
-                "DEBT_NOPELL_STGP_EVAL_MDN",
-                "DEBT_NOPELL_STGP_EVAL_MEAN",
-                "DEBT_ALL_PP_EVAL_MDN10YRPAY",
-                "PCIP01",
-                "PCIP03",
-                "PCIP04",
-                "PCIP05",
-                "PCIP09",
-                "PCIP10",
-                "PCIP11",
-                "PCIP12",
-                "PCIP13",
-                "PCIP14",
-                "PCIP15",
-                "PCIP16",
-                "PCIP19",
-                "PCIP22",
-                "PCIP23",
-                "PCIP24",
-                "PCIP25",
-                "PCIP26",
-                "PCIP27",
-                "PCIP29",
-                "PCIP30",
-                "PCIP31",
-                "PCIP38",
-                "PCIP39",
-                "PCIP40",
-                "PCIP41",
-                "PCIP42",
-                "PCIP43",
-                "PCIP44",
-                "PCIP45",
-                "PCIP46",
-                "PCIP47",
-                "PCIP48",
-                "PCIP49",
-                "PCIP50",
-                "PCIP51",
-                "PCIP52",
-                "PCIP54",
-                "UGNONDS"
-            ]]
-            
-        # cache the newly created dataframe as a .csv file
-        bach_df.to_csv("bach_table.csv")
+        bach_df = bach_df[BACH_COLUMNS]
+
+        # suppressible columns are still text in the full-width read
+        bach_df, masks = split_suppressed(bach_df, SUPPRESSIBLE_COLUMNS)
         
-        # print the df shape
-        print(f"dataframe shape: {bach_df.shape}")
+    # cache the newly created dataframe and its suppression masks
+    write_cached_table(bach_df, "bach_table", SOURCE_FILES, selection, masks)
 
-        # return the dataframe
-        return bach_df
+    if columns is not None:
+        bach_df = bach_df[columns]
+    
+    # print the df shape
+    print(f"dataframe shape: {bach_df.shape}")
+
+    # return the dataframe
+    return bach_df
+
+
+def get_suppression_masks(columns = None, projected = True):
+
+    '''Function that returns {column: boolean array} flagging which rows 
+    of the cached bachelor table were `PrivacySuppressed` rather than missing.
+
+    Masks follow the row order of `get_bach_df`; call that first so the 
+    cache exists.'''
+
+    filename = get_cached_filename("bach_table", SOURCE_FILES, get_bach_selection(projected), ext = "npz")
 
+    with np.load(filename) as masks:
+        return unpack_suppression_masks(masks, columns)
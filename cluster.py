@@ -0,0 +1,367 @@
+# notebook dependencies
+import pandas as pd
+import numpy as np
+import os
+import pickle
+import hashlib
+
+# visualization imports
+import matplotlib.pyplot as plt
+import seaborn as sns
+sns.set()
+
+from joblib import Parallel, delayed
+
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.model_selection import train_test_split
+
+import prepare
+
+
+# ------------------------------------------------------------------------------- #
+        # Clustering functions for the College Scorecard Dataset
+# ------------------------------------------------------------------------------- #
+
+# cluster feature families -> the columns each one clusters on
+CLUSTER_FEATURES = {
+    'admission_clusters_5yr': ['admission_rate', 'avg_sat_admitted', 'ACT_score_mid'],
+    'control_clusters_5yr': ['avg_net_price', 'full_time_net_tuition_revenue', 'avg_faculty_salary'],
+    'region_clusters_5yr': ['region_ipeds', 'avg_sat_admitted', 'avg_faculty_salary', 'admission_rate'],
+    'ft_clusters_5yr': [
+        'share_entering_students_first_ft',
+        'share_of_part_time',
+        'first_time_ft_student_retention',
+        'first_time_pt_student_retention'],
+    'major_clusters_5yr': [
+        col for cols in prepare.COLUMN_FAMILIES['deg_percent_awarded']['columns'].values() for col in cols],
+    'sat_clusters_5yr': ['avg_sat_admitted', 'ACT_score_mid', 'comp_rt_ft_150over_expected_time']}
+
+# the notebooks' elbow range
+K_RANGE = range(1, 25)
+
+# above this many rows the sweep switches to MiniBatchKMeans
+MINIBATCH_ROWS = 50_000
+
+# rows used for each silhouette score
+SILHOUETTE_SAMPLE = 4_000
+
+# bump when the sweep logic below changes
+SWEEP_VERSION = 1
+
+
+# ------------------------------------------------ #
+            # Feature Matrices #
+# ------------------------------------------------ #
+
+def get_cluster_matrix(df, columns):
+
+    '''Function that returns the min-max scaled feature matrix for a cluster
+    family (rows with any missing feature dropped), its row index and the
+    per-column (min, range) used to scale it.'''
+
+    X = df[columns].to_numpy(dtype = np.float64, na_value = np.nan)
+
+    complete = ~np.isnan(X).any(axis = 1)
+    X = X[complete]
+
+    col_min = X.min(axis = 0) if len(X) else np.zeros(len(columns))
+    col_range = (X.max(axis = 0) - col_min) if len(X) else np.ones(len(columns))
+    col_range[col_range == 0] = 1
+
+    return (X - col_min) / col_range, df.index[complete], (col_min, col_range)
+
+
+def get_matrix_fingerprint(X, settings):
+
+    '''Function that fingerprints a feature matrix together with the sweep settings.'''
+
+    h = hashlib.sha1(repr((SWEEP_VERSION, settings)).encode())
+
+    h.update(repr(X.shape).encode())
+    h.update(np.ascontiguousarray(X).tobytes())
+
+    return h.hexdigest()[:16]
+
+
+# ------------------------------------------------ #
+            # k Sweep #
+# ------------------------------------------------ #
+
+def get_silhouette_rows(n_rows, strata = None, sample_size = SILHOUETTE_SAMPLE, random_state = 123):
+
+    '''Function that picks the rows used for silhouette scores: all of them
+    when few enough, else a sample stratified on `strata` when given.'''
+
+    if n_rows <= sample_size:
+        return np.arange(n_rows)
+
+    rows, _ = train_test_split(
+        np.arange(n_rows),
+        train_size = sample_size,
+        random_state = random_state,
+        stratify = strata)
+
+    return np.sort(rows)
+
+
+def fit_k(X, k, minibatch = False, random_state = 123):
+
+    '''Function that fits one k of the sweep, returning (k, inertia, fitted model).'''
+
+    if minibatch:
+        model = MiniBatchKMeans(n_clusters = k, random_state = random_state, n_init = 'auto', batch_size = 4096)
+    else:
+        model = KMeans(n_clusters = k, random_state = random_state, n_init = 'auto')
+
+    model.fit(X)
+
+    return k, model.inertia_, model
+
+
+def get_silhouette_curve(X_sample, labels_by_k):
+
+    '''Function that scores every k's labels on the same sample at once: the 
+    pairwise distance matrix is built a single time, and each k's per-cluster 
+    distance sums are one matrix product with its one-hot labels.
+
+    Matches `silhouette_score` (singleton clusters score 0; k < 2 is NaN).'''
+
+    sq_norms = (X_sample ** 2).sum(axis = 1)
+    distances = np.sqrt(np.maximum(sq_norms[:, None] - 2 * X_sample @ X_sample.T + sq_norms[None, :], 0)).astype(np.float32)
+    np.fill_diagonal(distances, 0)
+
+    rows = np.arange(len(X_sample))
+    scores = {}
+
+    for k, labels in labels_by_k.items():
+
+        _, labels = np.unique(labels, return_inverse = True)
+        n_labels = labels.max() + 1
+
+        if n_labels < 2 or n_labels >= len(X_sample):
+            scores[k] = np.nan
+            continue
+
+        one_hot = np.zeros((len(X_sample), n_labels), dtype = np.float32)
+        one_hot[rows, labels] = 1
+
+        sums = distances @ one_hot
+        counts = one_hot.sum(axis = 0)
+        own_counts = counts[labels]
+
+        # mean distance within own cluster, and to the nearest other cluster
+        a = sums[rows, labels] / np.maximum(own_counts - 1, 1)
+        means = sums / counts
+        means[rows, labels] = np.inf
+        b = means.min(axis = 1)
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            s = np.nan_to_num((b - a) / np.maximum(a, b))
+
+        s[own_counts == 1] = 0
+
+        scores[k] = float(s.mean())
+
+    return scores
+
+
+def run_k_sweeps(df, families = CLUSTER_FEATURES, k_range = K_RANGE, strata_col = 'major_category',
+                 minibatch = None, n_jobs = -1, use_cache = True, random_state = 123):
+
+    '''Function that runs the elbow/silhouette k sweep for several cluster
+    families at once, every (family, k) fit running in parallel processes.
+
+    - `minibatch = None` picks MiniBatchKMeans for families above MINIBATCH_ROWS rows
+    - silhouette scores use a sample stratified on `strata_col`
+    - each family's results are pickled under the fingerprint of its feature
+      matrix and settings, and reloaded instead of refit on the next run
+
+    Returns {family: {'inertia': Series, 'silhouette': Series, 'models': {k: model},
+    'columns': [...], 'scaling': (min, range)}}.'''
+
+    results = {}
+    tasks = []
+
+    for family, columns in families.items():
+
+        X, index, scaling = get_cluster_matrix(df, columns)
+
+        family_minibatch = len(X) > MINIBATCH_ROWS if minibatch is None else minibatch
+
+        settings = (list(columns), list(k_range), family_minibatch, random_state)
+        cache_file = f'k_sweep_{family}_{get_matrix_fingerprint(X, settings)}.pkl'
+
+        if use_cache and os.path.isfile(cache_file):
+            with open(cache_file, 'rb') as f:
+                results[family] = pickle.load(f)
+            continue
+
+        strata = None
+        if strata_col in df and len(X) > SILHOUETTE_SAMPLE:
+            strata = prepare.get_sample_strata(df.loc[index, strata_col], SILHOUETTE_SAMPLE)
+
+        silhouette_rows = get_silhouette_rows(len(X), strata, random_state = random_state)
+
+        results[family] = {'columns': list(columns), 'scaling': scaling, 'cache_file': cache_file}
+
+        tasks += [(family, X, k, silhouette_rows, family_minibatch) for k in k_range if k <= len(X)]
+
+    fits = Parallel(n_jobs = n_jobs)(
+        delayed(fit_k)(X, k, family_minibatch, random_state)
+        for _, X, k, _, family_minibatch in tasks)
+
+    for (family, *_), (k, inertia, model) in zip(tasks, fits):
+
+        result = results[family]
+
+        result.setdefault('inertia', {})[k] = inertia
+        result.setdefault('models', {})[k] = model
+
+    for family, X, _, silhouette_rows, _ in {task[0]: task for task in tasks}.values():
+
+        result = results[family]
+
+        silhouette = get_silhouette_curve(
+            X[silhouette_rows], 
+            {k: model.labels_[silhouette_rows] for k, model in result['models'].items()})
+
+        result['inertia'] = pd.Series(result['inertia'], name = 'inertia').rename_axis('k')
+        result['silhouette'] = pd.Series(silhouette, name = 'silhouette').rename_axis('k')
+
+        if use_cache:
+            with open(result['cache_file'], 'wb') as f:
+                pickle.dump(result, f, protocol = pickle.HIGHEST_PROTOCOL)
+
+    return results
+
+
+def plot_k_sweeps(results):
+
+    '''Elbow (inertia) and silhouette curves for every swept cluster family'''
+
+    fig, axes = plt.subplots(len(results), 2, figsize = (12, 4 * len(results)), squeeze = False)
+
+    for (family, result), (ax_inertia, ax_silhouette) in zip(results.items(), axes):
+
+        result['inertia'].plot(ax = ax_inertia, marker = 'x')
+        ax_inertia.set_title(f'{family}: change in inertia as k increases')
+        ax_inertia.set_ylabel('inertia')
+
+        result['silhouette'].plot(ax = ax_silhouette, marker = 'x', color = 'purple')
+        ax_silhouette.set_title(f'{family}: silhouette score')
+        ax_silhouette.set_ylabel('silhouette')
+
+    plt.tight_layout()
+    plt.show()
+
+
+# ------------------------------------------------ #
+        # Persisted Cluster Features #
+# ------------------------------------------------ #
+
+# clusters per family used for the modeling features
+CLUSTER_K = {family: 5 for family in CLUSTER_FEATURES}
+
+# fitted scalers + centroids, reused to label val/test and new programs
+CLUSTER_MODELS_CACHE = 'cluster_models.pkl'
+
+# rows labeled per distance block
+ASSIGN_CHUNK_ROWS = 100_000
+
+
+def fit_cluster_features(train_df, families = CLUSTER_FEATURES, k = CLUSTER_K, sweeps = None, 
+                         cache_path = CLUSTER_MODELS_CACHE, random_state = 123):
+
+    '''Function that fits each cluster family on train and persists what 
+    labeling needs: the feature columns, the train min-max scaling and the 
+    centroids. Models already fitted in `run_k_sweeps` results (`sweeps`) 
+    are reused instead of refit, together with the scaling of the frame the 
+    sweep ran on.'''
+
+    fitted = {}
+
+    for family, columns in families.items():
+
+        if sweeps is not None and family in sweeps and k[family] in sweeps[family]['models']:
+            # centroids live in the sweep's scaled space, so its columns and scaling go with them
+            model = sweeps[family]['models'][k[family]]
+            columns, scaling = sweeps[family]['columns'], sweeps[family]['scaling']
+        else:
+            X, _, scaling = get_cluster_matrix(train_df, columns)
+            model = KMeans(n_clusters = k[family], random_state = random_state, n_init = 'auto').fit(X)
+
+        fitted[family] = {
+            'columns': list(columns),
+            'scaling': scaling,
+            'centroids': model.cluster_centers_}
+
+    if cache_path is not None:
+        with open(cache_path, 'wb') as f:
+            pickle.dump(fitted, f, protocol = pickle.HIGHEST_PROTOCOL)
+
+    return fitted
+
+
+def load_cluster_features(cache_path = CLUSTER_MODELS_CACHE):
+
+    '''Function that loads persisted cluster families from `fit_cluster_features`.'''
+
+    with open(cache_path, 'rb') as f:
+        return pickle.load(f)
+
+
+def assign_clusters(X, centroids, chunk_size = ASSIGN_CHUNK_ROWS):
+
+    '''Function that labels each row with its nearest centroid.
+
+    Squared distances are expanded as |x|^2 - 2 x.c + |c|^2 so each block of 
+    `chunk_size` rows is one matrix product; memory stays at chunk_size x k.'''
+
+    centroids = np.asarray(centroids, dtype = np.float64)
+    centroid_norms = (centroids ** 2).sum(axis = 1)
+
+    labels = np.empty(len(X), dtype = np.int64)
+
+    for start in range(0, len(X), chunk_size):
+
+        block = X[start:start + chunk_size]
+
+        # |x|^2 is the same for every centroid, so it drops out of the argmin
+        labels[start:start + chunk_size] = np.argmin(centroid_norms - 2 * block @ centroids.T, axis = 1)
+
+    return labels
+
+
+def add_cluster_features(df, fitted, chunk_size = ASSIGN_CHUNK_ROWS):
+
+    '''Function that adds a label column per persisted cluster family to any 
+    batch, scaled with the train scaling; no refit. Rows missing a feature 
+    get a missing label.'''
+
+    for family, model in fitted.items():
+
+        X = df[model['columns']].to_numpy(dtype = np.float64, na_value = np.nan)
+
+        col_min, col_range = model['scaling']
+        X = (X - col_min) / col_range
+
+        complete = ~np.isnan(X).any(axis = 1)
+
+        labels = np.full(len(df), -1, dtype = np.int64)
+        labels[complete] = assign_clusters(X[complete], model['centroids'], chunk_size)
+
+        df[family] = pd.arrays.IntegerArray(labels.astype(np.int8), mask = ~complete)
+
+    return df
+
+
+def get_cluster_features(train_df, val_df, test_df, sweeps = None):
+
+    '''Function that fits the cluster families on train once and labels all 
+    three splits with them (the columns `model.get_cluster_dummy` expects).'''
+
+    fitted = fit_cluster_features(train_df, sweeps = sweeps)
+
+    train_df, val_df, test_df = [add_cluster_features(df, fitted) for df in (train_df, val_df, test_df)]
+
+    return train_df, val_df, test_df
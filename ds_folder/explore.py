@@ -87,6 +87,8 @@ def get_fam_income_col(df, col_lst, new_col_string):
 
 def apply_fam_income_col(df):
     # applying the function ---
+    income_0_30000, income_30001_48000, income_48001_75000, income_75001_110000, income_over_110000 = create_merged_income_brackets()
+
     # list of cols to collapse
     frames = [
         income_30001_48000, 
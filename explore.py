@@ -8,7 +8,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 sns.set()
 
-from scipy.stats.mstats import winsorize
+from prepare import fit_percentile_caps, apply_percentile_caps
 from sklearn.impute import IterativeImputer
 from sklearn.experimental import enable_iterative_imputer
 
@@ -18,37 +18,31 @@ from sklearn.experimental import enable_iterative_imputer
 # ---------------------------------------------------------------- #
 
 
+# dont include target variables to cap
+CAPPING_EXCLUDED = [ 
+    "roi_5yr",
+    "roi_10yr",
+    "2017",                                               
+    "2018",                                                   
+    "2019",
+    "Grand Total",
+    "avg_net_price"]
+
+
 # Handles outliers 
-def percentile_capping(df, low_end, high_end):
+def percentile_capping(df, low_end, high_end, caps = None):
 
-    from scipy.stats.mstats import winsorize
+    '''Function that caps continuous variables at lower and higher end 
+    based on passed percentile values.
 
-    '''Function that uses scipy's winsorize method to cap
-    continuous variables at lower and higher end based on a passed 
-    percentile values.'''
+    Pass `caps` from `prepare.fit_percentile_caps(train, ...)` to cap 
+    validate/test at the train values; without it the caps are learned 
+    from `df` itself.'''
 
-    l1 = df.select_dtypes(include = "number").columns.tolist()
+    if caps is None:
+        caps = fit_percentile_caps(df, low_end, high_end, exclude = CAPPING_EXCLUDED)
 
-    # dont include target variables to cap
-    target_lst = [ 
-                "roi_5yr",
-                "roi_10yr",
-                "2017",                                               
-                "2018",                                                   
-                "2019",
-                "Grand Total",
-                "avg_net_price"]
-
-    col_lst = [col for col in l1 if col not in target_lst]
-
-    for col in col_lst:
-
-        stats.mstats.winsorize(
-            a = df[col], 
-            limits = (low_end, high_end), 
-            inplace = True)
-    
-    return df
+    return apply_percentile_caps(df, caps)
 
 # _____________________________________ #
 
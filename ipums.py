@@ -0,0 +1,739 @@
+# notebook dependencies
+import pandas as pd
+import numpy as np
+import os
+import re
+import glob
+import gzip
+
+from joblib import Parallel, delayed
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+
+# ------------------------------------------------------------------------------- #
+        # IPUMS USA (ACS 2015-2019) fixed-width extract
+# ------------------------------------------------------------------------------- #
+
+# codebook shipped with the extract: gives every variable's column span
+IPUMS_DICT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ipums_data_dict.txt")
+
+# raw extract as downloaded from IPUMS (usa_NNNNN.dat or .dat.gz)
+IPUMS_EXTRACT_PATTERN = "usa_*.dat*"
+
+# fields read when none are named
+EARNINGS_FIELDS = ["YEAR", "STATEFIP", "PERWT", "EDUCD", "DEGFIELD", "INCWAGE"]
+
+# income fields IPUMS writes with a leading minus sign for losses
+SIGNED_FIELDS = ("INCTOT", "INCEARN", "FTOTINC", "HHINCOME")
+
+# weights carry two implied decimals (PERWT 0001234567 = 12345.67)
+IMPLIED_DECIMALS = {"HHWT": 2, "PERWT": 2}
+
+# person records parsed per block
+CHUNK_ROWS = 1_000_000
+
+# columnar copy of the extract, hive-partitioned as YEAR=2019/STATEFIP=6/
+IPUMS_DATASET = "ipums_parquet"
+
+PARTITION_FIELDS = ["YEAR", "STATEFIP"]
+
+# per-year aggregate and sketch states, grouped by DEGFIELD x YEAR x STATEFIP
+EARNINGS_STORE = "earnings_store"
+
+STORE_BY = ["DEGFIELD", "YEAR", "STATEFIP"]
+
+# years of the earnings pivot the ROI target is built on
+EARNINGS_PIVOT_YEARS = [2017, 2018, 2019]
+
+
+# ------------------------------------------------ #
+            # Layout #
+# ------------------------------------------------ #
+
+def get_layout(dict_path = IPUMS_DICT):
+
+    '''Function that reads the variable table of the IPUMS codebook and
+    returns {variable: (zero-based start, width)}, in record order.
+
+    e.g. "  PERWT    P  90-99    10 ..." -> {"PERWT": (89, 10)}'''
+
+    layout = {}
+
+    pattern = re.compile(r"^\s+([A-Z][A-Z0-9_]*)\s+[HP]\s*(\d+)(?:-(\d+))?\s+(\d+)\s")
+
+    with open(dict_path) as f:
+        for line in f:
+
+            match = pattern.match(line)
+
+            if match:
+                name, start, end, width = match.groups()
+                layout[name] = (int(start) - 1, int(width))
+
+            elif layout and not line.strip():
+                # the variable table ends at the first blank line
+                break
+
+    return layout
+
+
+def get_record_length(layout):
+
+    '''Function that returns the record length (without line ending) of the extract.'''
+
+    return max(start + width for start, width in layout.values())
+
+
+def get_field_dtype(name, width):
+
+    '''Function that returns the smallest integer dtype holding every value a
+    field of `width` digits can take (signed for income fields).'''
+
+    largest = 10 ** width - 1
+
+    for dtype in ([np.int8, np.int16, np.int32, np.int64] if name in SIGNED_FIELDS else [np.uint8, np.uint16, np.uint32, np.uint64]):
+        if largest <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+
+    return np.dtype(np.int64)
+
+
+def get_extract_filename(filename = None):
+
+    '''Function that returns `filename`, or the newest local extract matching
+    IPUMS_EXTRACT_PATTERN.'''
+
+    if filename is not None:
+        return filename
+
+    extracts = sorted(glob.glob(IPUMS_EXTRACT_PATTERN), key = os.path.getmtime)
+
+    if not extracts:
+        raise FileNotFoundError(f"no IPUMS extract matching {IPUMS_EXTRACT_PATTERN} found")
+
+    return extracts[-1]
+
+
+# ------------------------------------------------ #
+            # Parsing #
+# ------------------------------------------------ #
+
+def parse_field(records, start, width, dtype):
+
+    '''Function that parses one fixed-width numeric field out of a
+    rows x record-bytes uint8 block by byte slicing: ASCII digits become
+    0-9 and are combined with powers of ten in one product. Blanks read as 0
+    and a leading "-" negates.'''
+
+    field = records[:, start:start + width]
+
+    digits = field - np.uint8(ord("0"))
+    digits[digits > 9] = 0
+
+    # float64 BLAS product is exact for the up-to-10-digit fields of the extract
+    values = (digits @ (10.0 ** np.arange(width - 1, -1, -1))).astype(np.int64)
+
+    if dtype.kind == "i":
+        values = np.where((field == ord("-")).any(axis = 1), -values, values)
+
+    return values.astype(dtype)
+
+
+def parse_records(records, fields, layout):
+
+    '''Function that parses the selected fields of a record block into a df.'''
+
+    return pd.DataFrame({
+        name: parse_field(records, *layout[name], get_field_dtype(name, layout[name][1]))
+        for name in fields})
+
+
+def get_line_length(head, record_length):
+
+    '''Function that returns the record length including its line ending
+    (\\n or \\r\\n), read off the first record.'''
+
+    if len(head) > record_length and head[record_length:record_length + 1] == b"\r":
+        return record_length + 2
+
+    return record_length + 1
+
+
+def get_dat_records(filename, record_length):
+
+    '''Function that memory-maps an uncompressed extract as a records x
+    line-bytes uint8 array; nothing is read until a slice is parsed.'''
+
+    data = np.memmap(filename, dtype = np.uint8, mode = "r")
+
+    line_length = get_line_length(bytes(data[:record_length + 2]), record_length)
+
+    return data[:len(data) // line_length * line_length].reshape(-1, line_length)
+
+
+def read_record_range(filename, start, stop, fields = EARNINGS_FIELDS, dict_path = IPUMS_DICT):
+
+    '''Function that parses records [start, stop) of an uncompressed extract, 
+    so separate workers can each take their own slice of the file.'''
+
+    layout = get_layout(dict_path)
+
+    records = get_dat_records(filename, get_record_length(layout))
+
+    return parse_records(records[start:stop], fields, layout)
+
+
+def get_record_ranges(filename = None, chunk_rows = CHUNK_ROWS, dict_path = IPUMS_DICT):
+
+    '''Function that splits an uncompressed extract into [start, stop) record ranges.'''
+
+    records = get_dat_records(get_extract_filename(filename), get_record_length(get_layout(dict_path)))
+
+    return [(start, min(start + chunk_rows, len(records))) for start in range(0, len(records), chunk_rows)]
+
+
+def iter_ipums_chunks(filename = None, fields = EARNINGS_FIELDS, chunk_rows = CHUNK_ROWS, dict_path = IPUMS_DICT):
+
+    '''Function that yields the extract as dfs of at most `chunk_rows` person
+    records, holding only the selected fields at their smallest integer dtypes.
+
+    A plain .dat is memory-mapped (no copy of the file is ever read in); a
+    .gz extract is streamed block by block.'''
+
+    filename = get_extract_filename(filename)
+
+    layout = get_layout(dict_path)
+
+    unknown = [name for name in fields if name not in layout]
+    if unknown:
+        raise KeyError(f"fields not in the IPUMS layout: {unknown}")
+
+    record_length = get_record_length(layout)
+
+    if filename.endswith(".gz"):
+
+        with gzip.open(filename, "rb") as f:
+
+            head = f.peek(record_length + 2)[:record_length + 2]
+            line_length = get_line_length(head, record_length)
+
+            while True:
+
+                block = f.read(chunk_rows * line_length)
+
+                if not block:
+                    break
+
+                n_rows = len(block) // line_length
+                records = np.frombuffer(block, dtype = np.uint8, count = n_rows * line_length).reshape(n_rows, line_length)
+
+                yield parse_records(records, fields, layout)
+
+    else:
+
+        records = get_dat_records(filename, record_length)
+
+        for start in range(0, len(records), chunk_rows):
+            yield parse_records(records[start:start + chunk_rows], fields, layout)
+
+
+def read_ipums(filename = None, fields = EARNINGS_FIELDS, chunk_rows = CHUNK_ROWS, dict_path = IPUMS_DICT):
+
+    '''Function that reads the selected fields of the whole extract into one df.'''
+
+    df = pd.concat(list(iter_ipums_chunks(filename, fields, chunk_rows, dict_path)), ignore_index = True)
+
+    print(f'dataframe shape: {df.shape}')
+
+    return df
+
+
+def get_weights(df, field = "PERWT"):
+
+    '''Function that returns a weight field in its real units (implied decimals applied).'''
+
+    return df[field].to_numpy(dtype = np.float64) / 10 ** IMPLIED_DECIMALS.get(field, 0)
+
+
+# ------------------------------------------------ #
+        # Weighted Earnings Aggregation #
+# ------------------------------------------------ #
+
+# bachelor's degree
+BACHELORS_EDUCD = 101
+
+# INCWAGE codes that are not wages (N/A and missing)
+INCWAGE_NOT_WAGES = (0, 999998, 999999)
+
+# DEGFIELD (general field of degree) -> `major_category` of the Scorecard table
+DEGFIELD_MAJORS = {
+    11: 'Agriculture',
+    13: 'Environment and Natural Resources',
+    14: 'Architecture',
+    15: 'Area, Ethnic, and Civilization Studies',
+    19: 'Communications',
+    20: 'Communication Technologies',
+    21: 'Computer and Information Sciences',
+    22: 'Cosmetology Services and Culinary Arts',
+    23: 'Education Administration and Teaching',
+    24: 'Engineering',
+    25: 'Engineering Technologies',
+    26: 'Linguistics and Foreign Languages',
+    29: 'Family and Consumer Sciences',
+    32: 'Law',
+    33: 'English Language, Literature, and Composition',
+    34: 'Liberal Arts and Humanities',
+    35: 'Library Science',
+    36: 'Biology and Life Sciences',
+    37: 'Mathematics and Statistics',
+    38: 'Military Technologies',
+    40: 'Interdisciplinary and Multi-Disciplinary Studies (General)',
+    41: 'Physical Fitness, Parks, Recreation, and Leisure',
+    48: 'Philosophy and Religious Studies',
+    49: 'Theology and Religious Vocations',
+    50: 'Physical Sciences',
+    51: 'Nuclear, Industrial Radiology, and Biological Technologies',
+    52: 'Psychology',
+    53: 'Criminal Justice and Fire Protection',
+    54: 'Public Affairs, Policy, and Social Work',
+    55: 'Social Sciences',
+    56: 'Construction Services',
+    57: 'Electrical and Mechanic Repairs and Technologies',
+    58: 'Precision Production and Industrial Arts',
+    59: 'Transportation Sciences and Technologies',
+    60: 'Fine Arts',
+    61: 'Medical and Health Sciences and Services',
+    62: 'Business',
+    64: 'History'}
+
+# columns of an aggregate state; every one is a plain sum, so states merge by addition
+EARNINGS_STATE_COLUMNS = ['count', 'weight_sum', 'wage_sum', 'weighted_wage_sum']
+
+
+def filter_bachelor_earners(df):
+
+    '''Function that keeps bachelor's degree holders with wage income and a 
+    mapped field of degree.'''
+
+    keep = (
+        (df['EDUCD'].to_numpy() == BACHELORS_EDUCD)
+        & ~np.isin(df['INCWAGE'].to_numpy(), INCWAGE_NOT_WAGES)
+        & np.isin(df['DEGFIELD'].to_numpy(), list(DEGFIELD_MAJORS)))
+
+    return df[keep]
+
+
+def aggregate_earnings_chunk(df, by = ['DEGFIELD', 'YEAR']):
+
+    '''Function that reduces one chunk of person records to a partial state: 
+    record count, PERWT sum, wage sum and PERWT-weighted wage sum per group.'''
+
+    df = filter_bachelor_earners(df)
+
+    weights = get_weights(df)
+    wages = df['INCWAGE'].to_numpy(dtype = np.float64)
+
+    return pd.DataFrame({
+        'count': 1,
+        'weight_sum': weights,
+        'wage_sum': wages,
+        'weighted_wage_sum': weights * wages}, index = df.index).groupby([df[col] for col in by]).sum()
+
+
+def merge_earnings_states(states):
+
+    '''Function that merges partial aggregate states (from chunks, workers 
+    or earlier runs) into one.'''
+
+    states = [state for state in states if len(state)]
+
+    if not states:
+        return pd.DataFrame(columns = EARNINGS_STATE_COLUMNS)
+
+    return pd.concat(states).groupby(level = list(range(states[0].index.nlevels))).sum()
+
+
+def aggregate_record_range(filename, start, stop, by = ['DEGFIELD', 'YEAR'], reducer = None):
+
+    '''Function that reduces one record range of an uncompressed extract (one 
+    worker's share) with `reducer` (default `aggregate_earnings_chunk`).'''
+
+    reducer = reducer or aggregate_earnings_chunk
+
+    fields = list(dict.fromkeys(['EDUCD', 'INCWAGE', 'PERWT'] + list(by)))
+
+    return reducer(read_record_range(filename, start, stop, fields), by)
+
+
+def aggregate_earnings(filename = None, by = ['DEGFIELD', 'YEAR'], chunk_rows = CHUNK_ROWS, n_jobs = 1, reducer = None):
+
+    '''Function that streams the extract and returns the merged aggregate 
+    state per `by` group. Memory stays at one chunk per worker whatever the 
+    extract size; uncompressed extracts are split into record ranges that 
+    `n_jobs` workers aggregate in parallel.
+
+    `reducer(chunk, by)` turns a chunk into a partial state whose rows merge 
+    by addition (default `aggregate_earnings_chunk`).'''
+
+    reducer = reducer or aggregate_earnings_chunk
+
+    filename = get_extract_filename(filename)
+
+    if filename.endswith(".gz"):
+
+        fields = list(dict.fromkeys(['EDUCD', 'INCWAGE', 'PERWT'] + list(by)))
+
+        states = [reducer(chunk, by) for chunk in iter_ipums_chunks(filename, fields, chunk_rows)]
+
+    else:
+
+        states = Parallel(n_jobs = n_jobs)(
+            delayed(aggregate_record_range)(filename, start, stop, by, reducer) 
+            for start, stop in get_record_ranges(filename, chunk_rows))
+
+    return merge_earnings_states(states)
+
+
+def get_earnings_by_major(state, sketch = None):
+
+    '''Function that finalizes a DEGFIELD x YEAR state into weighted (and 
+    unweighted) mean wages per major_category and earning_year. With a 
+    matching wage `sketch`, weighted p25/median/p75 wages are added.'''
+
+    df = state.reset_index()
+
+    df['major_category'] = df['DEGFIELD'].map(DEGFIELD_MAJORS)
+    df = df.rename(columns = {'YEAR': 'earning_year'})
+
+    df = df.groupby(['major_category', 'earning_year'])[EARNINGS_STATE_COLUMNS].sum()
+
+    df['mean_wage'] = df['weighted_wage_sum'] / df['weight_sum']
+    df['unweighted_mean_wage'] = df['wage_sum'] / df['count']
+
+    if sketch is not None:
+        df = df.join(get_sketch_quantiles(get_sketch_by_major(sketch)))
+
+    return df
+
+
+def get_earnings_pivot(state, value = 'mean_wage', sketch = None):
+
+    '''Function that pivots finalized earnings to one row per major_category 
+    and one column per year (plus the all-years "Grand Total"), the layout of 
+    `2017_2018_2019_earning_by_major.csv`.
+
+    `value` is 'mean_wage', 'unweighted_mean_wage' or, given `sketch`, one of 
+    the EARNINGS_QUANTILES names such as 'median_wage'.'''
+
+    by_major = get_earnings_by_major(state, sketch)
+
+    pivot = by_major[value].unstack('earning_year')
+    pivot.columns = [str(year) for year in pivot.columns]
+
+    totals = by_major.groupby(level = 'major_category')[EARNINGS_STATE_COLUMNS].sum()
+
+    if value == 'mean_wage':
+        pivot['Grand Total'] = totals['weighted_wage_sum'] / totals['weight_sum']
+    elif value == 'unweighted_mean_wage':
+        pivot['Grand Total'] = totals['wage_sum'] / totals['count']
+    else:
+        all_years = get_sketch_by_major(sketch).groupby(level = ['major_category', 'bucket']).sum()
+        pivot['Grand Total'] = get_sketch_quantiles(all_years)[value]
+
+    return pivot.reset_index()
+
+
+# ------------------------------------------------ #
+        # Weighted Earnings Quantiles #
+# ------------------------------------------------ #
+
+# relative accuracy of sketched wage quantiles (0.5%)
+SKETCH_ALPHA = 0.005
+
+EARNINGS_QUANTILES = {'p25_wage': 0.25, 'median_wage': 0.5, 'p75_wage': 0.75}
+
+
+def get_sketch_gamma(alpha = SKETCH_ALPHA):
+
+    '''Function that returns the ratio between consecutive sketch bucket bounds.'''
+
+    return (1 + alpha) / (1 - alpha)
+
+
+def sketch_earnings_chunk(df, by = ['DEGFIELD', 'YEAR'], alpha = SKETCH_ALPHA):
+
+    '''Function that reduces one chunk of person records to a weighted wage 
+    sketch: PERWT summed per `by` group and log-spaced wage bucket.
+
+    Bucket i holds wages in (gamma**(i-1), gamma**i], so any quantile read 
+    off the sketch is within `alpha` relative error of the exact weighted 
+    quantile. Buckets are plain weight sums, so sketches from chunks, 
+    workers or states merge with `merge_earnings_states` in any order.'''
+
+    df = filter_bachelor_earners(df)
+
+    buckets = np.ceil(np.log(df['INCWAGE'].to_numpy(dtype = np.float64)) / np.log(get_sketch_gamma(alpha))).astype(np.int16)
+
+    return pd.DataFrame({'weight': get_weights(df)}, index = df.index).groupby(
+        [df[col] for col in by] + [pd.Series(buckets, index = df.index, name = 'bucket')]).sum()
+
+
+def sketch_earnings(filename = None, by = ['DEGFIELD', 'YEAR'], chunk_rows = CHUNK_ROWS, n_jobs = 1):
+
+    '''Function that sketches PERWT-weighted wages per `by` group (e.g. with 
+    'STATEFIP' added) in a single pass over the extract.'''
+
+    return aggregate_earnings(filename, by, chunk_rows, n_jobs, reducer = sketch_earnings_chunk)
+
+
+def get_sketch_quantiles(sketch, quantiles = EARNINGS_QUANTILES, alpha = SKETCH_ALPHA):
+
+    '''Function that reads weighted quantiles per group off a wage sketch.
+
+    Returns one row per group and one column per quantile name.'''
+
+    groups = sketch.index.names[:-1]
+
+    sketch = sketch.sort_index()
+
+    weights = sketch['weight']
+    ranks = weights.groupby(level = groups).cumsum() / weights.groupby(level = groups).transform('sum')
+
+    gamma = get_sketch_gamma(alpha)
+    values = pd.Series(
+        2 * gamma ** sketch.index.get_level_values('bucket').to_numpy(dtype = np.float64) / (gamma + 1), index = sketch.index)
+
+    return pd.DataFrame({
+        name: values[ranks.to_numpy() >= q].groupby(level = groups).first()
+        for name, q in quantiles.items()})
+
+
+def get_sketch_by_major(sketch):
+
+    '''Function that merges a DEGFIELD-keyed sketch into major_category 
+    groups, renaming YEAR to earning_year.'''
+
+    groups = ['major_category' if col == 'DEGFIELD' else col for col in sketch.index.names]
+
+    df = sketch.reset_index()
+    df['major_category'] = df['DEGFIELD'].map(DEGFIELD_MAJORS)
+
+    return df.groupby(groups)[['weight']].sum().rename_axis(index = {'YEAR': 'earning_year'})
+
+
+# ------------------------------------------------ #
+        # Partitioned Columnar Dataset #
+# ------------------------------------------------ #
+
+def get_partitioning(dict_path = IPUMS_DICT):
+
+    '''Function that returns the hive YEAR/STATEFIP partitioning at the parsed dtypes.'''
+
+    layout = get_layout(dict_path)
+
+    return ds.partitioning(pa.schema([
+        (name, pa.from_numpy_dtype(get_field_dtype(name, layout[name][1]))) for name in PARTITION_FIELDS]), flavor = "hive")
+
+
+def write_ipums_dataset(filename = None, dataset_path = IPUMS_DATASET, fields = None, chunk_rows = CHUNK_ROWS, dict_path = IPUMS_DICT):
+
+    '''Function that converts the fixed-width extract to a parquet dataset 
+    partitioned by YEAR and STATEFIP, one chunk at a time.
+
+    `fields` defaults to every variable of the codebook. Rows are sorted by 
+    the partition keys within each chunk so each chunk lands in contiguous 
+    row groups per partition; partitions already on disk are replaced.'''
+
+    layout = get_layout(dict_path)
+
+    fields = list(dict.fromkeys(PARTITION_FIELDS + list(fields or layout)))
+
+    schema = pa.schema([(name, pa.from_numpy_dtype(get_field_dtype(name, layout[name][1]))) for name in fields])
+
+    batches = (
+        pa.RecordBatch.from_pandas(chunk.sort_values(PARTITION_FIELDS, kind = "stable"), schema = schema, preserve_index = False)
+        for chunk in iter_ipums_chunks(filename, fields, chunk_rows, dict_path))
+
+    ds.write_dataset(
+        batches, dataset_path, schema = schema, format = "parquet",
+        partitioning = get_partitioning(dict_path),
+        file_options = ds.ParquetFileFormat().make_write_options(compression = "zstd"),
+        existing_data_behavior = "delete_matching")
+
+    print(f"extract written to {dataset_path}/ partitioned by {PARTITION_FIELDS}")
+
+
+def get_filter_expression(filters):
+
+    '''Function that turns {field: value or list of values} into a dataset 
+    filter expression (None for no filter).'''
+
+    expression = None
+
+    for name, value in (filters or {}).items():
+
+        if isinstance(value, (list, tuple, set, np.ndarray)):
+            condition = ds.field(name).isin(list(value))
+        else:
+            condition = ds.field(name) == value
+
+        expression = condition if expression is None else expression & condition
+
+    return expression
+
+
+def open_ipums_dataset(dataset_path = IPUMS_DATASET, dict_path = IPUMS_DICT):
+
+    '''Function that opens the partitioned dataset without reading any data.'''
+
+    return ds.dataset(dataset_path, format = "parquet", partitioning = get_partitioning(dict_path))
+
+
+def query_ipums(filters = None, columns = None, dataset_path = IPUMS_DATASET):
+
+    '''Function that reads the rows matching `filters` and only the requested 
+    `columns` from the partitioned dataset.
+
+    Filters on YEAR/STATEFIP prune whole partitions before any file is 
+    opened; filters on other fields skip row groups using parquet statistics.
+
+    e.g. query_ipums({"YEAR": 2019, "STATEFIP": 6}, EARNINGS_FIELDS)'''
+
+    table = open_ipums_dataset(dataset_path).to_table(columns = columns, filter = get_filter_expression(filters))
+
+    df = table.to_pandas()
+
+    print(f'dataframe shape: {df.shape}')
+
+    return df
+
+
+def aggregate_ipums_dataset(filters = None, by = ['DEGFIELD', 'YEAR'], reducer = None, dataset_path = IPUMS_DATASET):
+
+    '''Function that runs an earnings reducer (default `aggregate_earnings_chunk`, 
+    or `sketch_earnings_chunk`) batch by batch over only the partitions and 
+    columns the query needs, returning the merged state.'''
+
+    reducer = reducer or aggregate_earnings_chunk
+
+    columns = list(dict.fromkeys(['EDUCD', 'INCWAGE', 'PERWT'] + list(by)))
+
+    batches = open_ipums_dataset(dataset_path).to_batches(columns = columns, filter = get_filter_expression(filters))
+
+    return merge_earnings_states([reducer(batch.to_pandas(), by) for batch in batches if batch.num_rows])
+
+
+# ------------------------------------------------ #
+        # Incremental Earnings Store #
+# ------------------------------------------------ #
+
+# state kind -> chunk reducer; each kind is stored as one parquet file per year
+STORE_REDUCERS = {'state': aggregate_earnings_chunk, 'sketch': sketch_earnings_chunk}
+
+
+def get_dataset_years(dataset_path = IPUMS_DATASET):
+
+    '''Function that lists the years in the partitioned dataset from its 
+    directory names, without opening any file.'''
+
+    return sorted({int(year) for year in re.findall(r"YEAR=(\d+)", " ".join(open_ipums_dataset(dataset_path).files))})
+
+
+def get_store_filename(kind, year, store_path = EARNINGS_STORE):
+
+    '''Function that returns the store file of one year's `kind` state.'''
+
+    return os.path.join(store_path, f"{kind}_{year}.parquet")
+
+
+def get_store_years(store_path = EARNINGS_STORE):
+
+    '''Function that lists the years whose states are complete in the store.'''
+
+    years = [
+        {int(year) for year in re.findall(rf"{kind}_(\d+)\.parquet", " ".join(glob.glob(os.path.join(store_path, f"{kind}_*.parquet"))))}
+        for kind in STORE_REDUCERS]
+
+    return sorted(set.intersection(*years))
+
+
+def update_earnings_store(years = None, dataset_path = IPUMS_DATASET, store_path = EARNINGS_STORE, refresh = False):
+
+    '''Function that ingests years of the partitioned dataset into the store.
+
+    By default only years in the dataset but not yet in the store are read 
+    (e.g. after `write_ipums_dataset` on a new year's extract, which adds 
+    its partitions next to the existing ones), so a refresh costs one year 
+    of records. `refresh` re-ingests the requested years.
+
+    Returns the years ingested.'''
+
+    os.makedirs(store_path, exist_ok = True)
+
+    years = get_dataset_years(dataset_path) if years is None else sorted(years)
+
+    if not refresh:
+        years = [year for year in years if year not in get_store_years(store_path)]
+
+    columns = list(dict.fromkeys(['EDUCD', 'INCWAGE', 'PERWT'] + STORE_BY))
+
+    for year in years:
+
+        states = {kind: [] for kind in STORE_REDUCERS}
+
+        # one read of the year's partitions feeds every state kind
+        for batch in open_ipums_dataset(dataset_path).to_batches(columns = columns, filter = get_filter_expression({'YEAR': year})):
+
+            df = batch.to_pandas()
+
+            for kind, reducer in STORE_REDUCERS.items():
+                states[kind].append(reducer(df, STORE_BY))
+
+        for kind in STORE_REDUCERS:
+            merge_earnings_states(states[kind]).to_parquet(get_store_filename(kind, year, store_path))
+
+        print(f"ingested {year} into {store_path}/")
+
+    return years
+
+
+def load_earnings_store(years = None, by = ['DEGFIELD', 'YEAR'], store_path = EARNINGS_STORE):
+
+    '''Function that merges the stored states of `years` (default all) into 
+    an aggregate state and a wage sketch grouped by `by`.'''
+
+    years = get_store_years(store_path) if years is None else years
+
+    if not years:
+        raise FileNotFoundError(f"no earnings states in {store_path}, run update_earnings_store first")
+
+    state, sketch = [
+        pd.concat([pd.read_parquet(get_store_filename(kind, year, store_path)) for year in years])
+        for kind in STORE_REDUCERS]
+
+    return (
+        state.groupby(level = list(by)).sum(), 
+        sketch.groupby(level = list(by) + ['bucket']).sum())
+
+
+def write_earnings_pivot(years = EARNINGS_PIVOT_YEARS, value = 'mean_wage', filename = None, store_path = EARNINGS_STORE):
+
+    '''Function that writes an earnings pivot for `prepare.merge_earnings`, 
+    one column per year, named after its years unless `filename` is given 
+    (e.g. 2017_2018_2019_earning_by_major.csv). Defaults reproduce the 
+    pivot the ROI target was built on; pass `years` and `value` (e.g. 
+    'median_wage') to build others.'''
+
+    years = sorted(years)
+
+    state, sketch = load_earnings_store(years, store_path = store_path)
+
+    filename = filename or f"{'_'.join(str(year) for year in years)}_earning_by_major.csv"
+
+    get_earnings_pivot(state, value, sketch).to_csv(filename)
+
+    print(f"earnings pivot written to {filename}")
+
+    return filename
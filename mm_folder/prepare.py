@@ -813,52 +813,49 @@ def manual_imputer(df):
 
 
 
-def label_states(row):
-    '''Function that creates state bin / us region category''' 
-
-    if row['state_post_code'] in ['GU', 'VI', 'PR',	'MP', 'FM',	'MH', 'AS']:
-
-        return "us_foreign"
-
-    elif row['state_post_code'] in ['CA', 'AK', 'OR', 'WA', 'HI']:
-
-        return "west_pacific"
-
-    elif row['state_post_code'] in ['MT', 'AZ', 'CO', 'ID', 'NV', 'NM', 'UT']:
-
-        return "west_mountain"
-    
-    elif row['state_post_code'] in ['ND', 'SD', 'MN', 'NE', 'IA', 'KS', 'MO', 'WY']:
-
-        return "midwest_north_central"
-
-    elif row['state_post_code'] in ['OK',	'AR', 'TX', 'LA']:
-
-        return "midwest_south_central"
+# state post code -> us region bins
+# (New England shares the "east_south_atlantic" label, as it always has)
+US_REGIONS = {
+    "us_foreign": ['GU', 'VI', 'PR', 'MP', 'FM', 'MH', 'AS'],
+    "west_pacific": ['CA', 'AK', 'OR', 'WA', 'HI'],
+    "west_mountain": ['MT', 'AZ', 'CO', 'ID', 'NV', 'NM', 'UT'],
+    "midwest_north_central": ['ND', 'SD', 'MN', 'NE', 'IA', 'KS', 'MO', 'WY'],
+    "midwest_south_central": ['OK', 'AR', 'TX', 'LA'],
+    "east_north_central": ['MI', 'WI', 'IL', 'IN', 'OH'],
+    "east_south_central": ['KY', 'TN', 'MS', 'AL'],
+    "east_north_atlantic": ['NY', 'PA', 'NJ'],
+    "east_south_atlantic": ['WV', 'MD', 'DE', 'VA', 'DC', 'NC', 'SC', 'GA', 'FL', 'CT', 'MA', 'ME', 'NH', 'RI', 'VT']
+}
+
+# flat code table and fixed vocabulary built once at import
+STATE_REGION_LOOKUP = {state: region for region, states in US_REGIONS.items() for state in states}
+
+US_REGION_VOCAB = list(US_REGIONS)
 
-    elif row['state_post_code'] in ['MI', 'WI', 'IL', 'IN', 'OH']:
 
-        return "east_north_central"
-
-    elif row['state_post_code'] in ['KY', 'TN', 'MS',	'AL']:
+def label_states(row):
+    '''Function that creates state bin / us region category
 
-        return "east_south_central"
+    Row-wise version of `label_us_regions`, kept for `df.apply(axis = 1)` use.''' 
 
-    elif row['state_post_code'] in ['NY', 'PA', 'NJ']:
+    return STATE_REGION_LOOKUP.get(row['state_post_code'], np.nan)
 
-        return "east_north_atlantic"
 
-    elif row['state_post_code'] in ['WV', 'MD', 'DE', 'VA', 'DC', 'NC', 'SC', 'GA', 'FL']:
+def label_us_regions(state_post_codes):
+    '''Function that bins a whole `state_post_code` column into us regions 
+    at once, returning a pandas Categorical over `US_REGION_VOCAB`.
 
-        return "east_south_atlantic"
-   
-    elif row['state_post_code'] in ['CT', 'MA', 'ME', 'NH', 'ME', 'RI', 'VT']:
+    Unknown or missing state codes come back as NaN.'''
 
-        return "east_south_atlantic"
+    states = pd.Categorical(state_post_codes)
 
-    else:
+    # vocab position of every distinct state (-1 = NaN); the trailing slot catches nulls
+    region_codes = np.array(
+        [US_REGION_VOCAB.index(STATE_REGION_LOOKUP[state]) if state in STATE_REGION_LOOKUP else -1 for state in states.categories]
+        + [-1],
+        dtype = np.int8)
 
-        return np.NaN
+    return pd.Categorical.from_codes(region_codes[states.codes], categories = US_REGION_VOCAB)
 
 
 def get_share_bins(train_df, val_df, test_df):
@@ -7,6 +7,7 @@ import os
 import math
 from math import sqrt
 import scipy.stats as stats
+from scipy.sparse import csr_matrix
 
 # visualization imports
 import matplotlib.pyplot as plt
@@ -33,56 +34,123 @@ from sklearn.linear_model import LinearRegression, LassoLars, TweedieRegressor,
         # Binning and Dummy Var Functions #
 # ------------------------------------------------ #
 
-def get_share_bins(train_df, val_df, test_df):
-
-    # train transformations
-    train_df['share_entering_ft_binned'] = pd.qcut(
-    train_df['share_entering_students_first_ft'], \
-    q = 4, \
-    labels = ["below_average", "average", "above_average", "highest_average"])
-
-    train_df['admission_rate_binned'] = pd.qcut(
-    train_df['admission_rate'], \
-    q = 5, \
-    labels = ["very_competitive", "somewhat_competitive", "competitive", "average_acceptance", "above_average_acceptance"])
-
-    train_df["SAT_binned"] = pd.qcut(
-    train_df['avg_sat_admitted'], \
-    q = 4, \
-    labels = ["average_sat", "above_average_sat", "competitive_sat", "very_competitive_sat"])
-
-    # validate transformations
-    val_df['share_entering_ft_binned'] = pd.qcut(
-        val_df['share_entering_students_first_ft'], \
-        q = 4, \
-        labels = ["below_average", "average", "above_average", "highest_average"])
-
-    val_df['admission_rate_binned'] = pd.qcut(
-    val_df['admission_rate'], \
-    q = 5, \
-    labels = ["very_competitive", "somewhat_competitive", "competitive", "average_acceptance", "above_average_acceptance"])
-
-    val_df["SAT_binned"] = pd.qcut(
-    val_df['avg_sat_admitted'], \
-    q = 4, \
-    labels = ["average_sat", "above_average_sat", "competitive_sat", "very_competitive_sat"])
-
-    # test transformations
-    test_df['share_entering_ft_binned'] = pd.qcut(
-        test_df['share_entering_students_first_ft'], \
-        q = 4, \
-        labels = ["below_average", "average", "above_average", "highest_average"])
-
-    test_df['admission_rate_binned'] = pd.qcut(
-    test_df['admission_rate'], \
-    q = 5, \
-    labels = ["very_competitive", "somewhat_competitive", "competitive", "average_acceptance", "above_average_acceptance"])
-
-    test_df["SAT_binned"] = pd.qcut(
-    test_df['avg_sat_admitted'], \
-    q = 4, \
-    labels = ["average_sat", "above_average_sat", "competitive_sat", "very_competitive_sat"])
+# binned column -> (source column, number of quantile bins, labels)
+SHARE_BINS = {
+    'share_entering_ft_binned': (
+        'share_entering_students_first_ft', 4, 
+        ["below_average", "average", "above_average", "highest_average"]),
+    'admission_rate_binned': (
+        'admission_rate', 5, 
+        ["very_competitive", "somewhat_competitive", "competitive", "average_acceptance", "above_average_acceptance"]),
+    'SAT_binned': (
+        'avg_sat_admitted', 4, 
+        ["average_sat", "above_average_sat", "competitive_sat", "very_competitive_sat"])}
 
+# values kept per level of the streaming quantile sketch
+SKETCH_SIZE = 2048
+
+
+def update_quantile_sketch(sketch, values, sketch_size = SKETCH_SIZE, random_state = 123):
+
+    '''Function that folds a chunk of values into a streaming quantile sketch 
+    (a list of levels; each value at level i stands for 2**i values).
+
+    When a level outgrows `sketch_size` it is sorted and every other value 
+    (random offset) is promoted a level up, so memory stays bounded while 
+    rank errors stay small. Returns the updated sketch.'''
+
+    rng = np.random.default_rng(random_state + len(sketch))
+
+    values = np.asarray(values, dtype = np.float64)
+    carry = values[~np.isnan(values)]
+
+    level = 0
+
+    while carry.size:
+
+        if level == len(sketch):
+            sketch.append(np.empty(0))
+
+        merged = np.concatenate([sketch[level], carry])
+
+        if merged.size <= sketch_size:
+            sketch[level] = merged
+            break
+
+        merged.sort()
+        sketch[level] = np.empty(0)
+        carry = merged[rng.integers(2)::2]
+        level += 1
+
+    return sketch
+
+
+def sketch_quantiles(sketch, quantiles):
+
+    '''Function that reads approximate quantiles off a streaming quantile sketch.'''
+
+    values = np.concatenate(sketch)
+    weights = np.concatenate([np.full(level.size, 2.0 ** i) for i, level in enumerate(sketch)])
+
+    order = np.argsort(values)
+    ranks = np.cumsum(weights[order]) / weights.sum()
+
+    return values[order][np.minimum(np.searchsorted(ranks, quantiles), len(values) - 1)]
+
+
+def fit_share_bins(train_df, bins = SHARE_BINS):
+
+    '''Function that learns the quantile bin edges on train only.
+
+    `train_df` is either the training df or an iterable of training chunks, 
+    in which case the edges come from a streaming quantile sketch.
+
+    Returns a dict of binned column -> interior edges.'''
+
+    if isinstance(train_df, pd.DataFrame):
+        return {
+            new_col: np.nanquantile(train_df[col].to_numpy(dtype = np.float64, na_value = np.nan), np.linspace(0, 1, q + 1)[1:-1])
+            for new_col, (col, q, _) in bins.items()}
+
+    sketches = {new_col: [] for new_col in bins}
+
+    for chunk in train_df:
+        for new_col, (col, _, _) in bins.items():
+            update_quantile_sketch(sketches[new_col], chunk[col].to_numpy(dtype = np.float64, na_value = np.nan))
+
+    return {
+        new_col: sketch_quantiles(sketches[new_col], np.linspace(0, 1, q + 1)[1:-1])
+        for new_col, (_, q, _) in bins.items()}
+
+
+def apply_share_bins(df, edges, bins = SHARE_BINS):
+
+    '''Function that assigns train-fitted bins to any batch (down to a single row) 
+    with `searchsorted`. Bins are right-closed like `pd.qcut`; values beyond 
+    the train range fall into the end bins and NaNs stay NaN.'''
+
+    for new_col, (col, _, labels) in bins.items():
+
+        values = df[col].to_numpy(dtype = np.float64, na_value = np.nan)
+
+        codes = np.searchsorted(edges[new_col], values, side = 'left')
+        codes[np.isnan(values)] = -1
+
+        df[new_col] = pd.Categorical.from_codes(codes, categories = labels)
+
+    return df
+
+
+def get_share_bins(train_df, val_df, test_df, edges = None):
+
+    '''Function that bins first-time full-time share, admission rate and SAT 
+    into quantile bins learned on train (or passed in as `edges`) and applies 
+    the same edges to all three splits.'''
+
+    if edges is None:
+        edges = fit_share_bins(train_df)
+
+    train_df, val_df, test_df = [apply_share_bins(df, edges) for df in (train_df, val_df, test_df)]
 
     print(f'train shape: {train_df.shape}')
     print(f'validate shape: {val_df.shape}')
@@ -95,47 +163,104 @@ def get_share_bins(train_df, val_df, test_df):
 # ------------------------------------------------ #
 
 
-def get_dummy_dataframes(train_df, val_df, test_df):
-    '''Function creates new dataframes with dummy variables for modeling'''
-
-    # train dataset
-    train_dummy = pd.get_dummies(
-        data = train_df, 
-        columns = [
-        'major_category',
-        'share_entering_ft_binned',
-        'institution_control',
-        'us_region',
-        'admission_rate_binned',
-        'SAT_binned'],
-        drop_first = False, 
-        dtype = bool)
-
-    # validate dataset
-    val_dummy = pd.get_dummies(
-        data = val_df, 
-        columns = [
-        'major_category',
-        'share_entering_ft_binned',
-        'institution_control',
-        'us_region',
-        'admission_rate_binned',
-        'SAT_binned'],
-        drop_first = False, 
-        dtype = bool)
-
-    # test dataset
-    test_dummy = pd.get_dummies(
-        data = test_df, 
-        columns = [
-        'major_category',
-        'share_entering_ft_binned',
-        'institution_control',
-        'us_region',
-        'admission_rate_binned',
-        'SAT_binned'],
-        drop_first = False, 
-        dtype = bool)
+# categorical features one-hot encoded for modeling
+DUMMY_COLUMNS = [
+    'major_category',
+    'share_entering_ft_binned',
+    'institution_control',
+    'us_region',
+    'admission_rate_binned',
+    'SAT_binned']
+
+CLUSTER_DUMMY_COLUMNS = [
+    'admission_clusters_5yr',
+    'control_clusters_5yr',
+    'region_clusters_5yr',
+    'ft_clusters_5yr',
+    'major_clusters_5yr',
+    'sat_clusters_5yr']
+
+
+def fit_one_hot(train_df, columns):
+
+    '''Function that learns each column's vocabulary on train: the category 
+    order for categoricals, sorted distinct values otherwise (as `pd.get_dummies`).'''
+
+    vocabs = {}
+
+    for col in columns:
+
+        values = train_df[col]
+
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            vocabs[col] = values.cat.categories.tolist()
+        else:
+            vocabs[col] = sorted(values.dropna().unique().tolist())
+
+    return vocabs
+
+
+def encode_one_hot(df, vocabs, sparse = False):
+
+    '''Function that one-hot encodes `df` against train vocabularies, returning 
+    the matrix (SciPy CSR if `sparse`, else dense uint8) and its column names.
+
+    Column order is fixed by the vocabularies, so every split lines up; 
+    categories unseen on train (and NaNs) encode as all zeros.'''
+
+    names = [f'{col}_{category}' for col, vocab in vocabs.items() for category in vocab]
+
+    rows = []
+    cols = []
+    offset = 0
+
+    for col, vocab in vocabs.items():
+
+        codes = pd.Categorical(df[col], categories = vocab).codes
+
+        hit = np.flatnonzero(codes >= 0)
+
+        rows.append(hit)
+        cols.append(codes[hit].astype(np.int64) + offset)
+
+        offset += len(vocab)
+
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype = np.int64)
+    cols = np.concatenate(cols) if cols else np.empty(0, dtype = np.int64)
+
+    if sparse:
+        matrix = csr_matrix((np.ones(len(rows), dtype = np.uint8), (rows, cols)), shape = (len(df), len(names)))
+    else:
+        matrix = np.zeros((len(df), len(names)), dtype = np.uint8)
+        matrix[rows, cols] = 1
+
+    return matrix, names
+
+
+def get_dummies_frame(df, vocabs, sparse = False):
+
+    '''Function that swaps the encoded columns of `df` for their train-vocabulary 
+    dummies (uint8, or pandas sparse columns if `sparse`), appended at the end 
+    like `pd.get_dummies`.'''
+
+    matrix, names = encode_one_hot(df, vocabs, sparse)
+
+    if sparse:
+        dummies = pd.DataFrame.sparse.from_spmatrix(matrix, index = df.index, columns = names)
+    else:
+        dummies = pd.DataFrame(matrix, index = df.index, columns = names)
+
+    return pd.concat([df.drop(columns = list(vocabs)), dummies], axis = 1)
+
+
+def get_dummy_dataframes(train_df, val_df, test_df, vocabs = None, sparse = False):
+    '''Function creates new dataframes with dummy variables for modeling, 
+    using vocabularies learned on train (or passed in as `vocabs`)'''
+
+    if vocabs is None:
+        vocabs = fit_one_hot(train_df, DUMMY_COLUMNS)
+
+    train_dummy, val_dummy, test_dummy = [get_dummies_frame(df, vocabs, sparse) for df in (train_df, val_df, test_df)]
 
     print(f'train shape: {train_dummy.shape}')
     print(f'validate shape: {val_dummy.shape}')
@@ -145,43 +270,14 @@ def get_dummy_dataframes(train_df, val_df, test_df):
     return train_dummy, val_dummy, test_dummy
 
 
-def get_cluster_dummy(train_df, val_df, test_df):
+def get_cluster_dummy(train_df, val_df, test_df, vocabs = None, sparse = False):
     '''After clustering, this function intends to create dummy variables for
-    clusters to assist in modeling'''
-
-    # train dataset
-    train_dummy = pd.get_dummies(data = train_df, columns = [
-        'admission_clusters_5yr',
-        'control_clusters_5yr',
-        'region_clusters_5yr',
-        'ft_clusters_5yr',
-        'major_clusters_5yr',
-        'sat_clusters_5yr'
-        ],
-        drop_first = False, 
-        dtype = bool)
-
-    # validate dataset
-    validate_dummy = pd.get_dummies(data = val_df, columns = [
-        'admission_clusters_5yr',
-        'control_clusters_5yr',
-        'region_clusters_5yr',
-        'ft_clusters_5yr',
-        'major_clusters_5yr',
-        'sat_clusters_5yr'],
-        drop_first = False, 
-        dtype = bool)
-
-    # test dataset
-    test_dummy = pd.get_dummies(data = test_df, columns = [
-        'admission_clusters_5yr',
-        'control_clusters_5yr',
-        'region_clusters_5yr',
-        'ft_clusters_5yr',
-        'major_clusters_5yr',
-        'sat_clusters_5yr'],
-        drop_first = False, 
-        dtype = bool)
+    clusters to assist in modeling, using vocabularies learned on train'''
+
+    if vocabs is None:
+        vocabs = fit_one_hot(train_df, CLUSTER_DUMMY_COLUMNS)
+
+    train_dummy, validate_dummy, test_dummy = [get_dummies_frame(df, vocabs, sparse) for df in (train_df, val_df, test_df)]
 
     # returning the new dataframes
     return train_dummy, validate_dummy, test_dummy
@@ -216,26 +312,84 @@ def establish_baseline(train, validate):
 
     return train, validate
 
-def recursive_feature_eliminate(X_train, y_train, number_of_top_features):
-    '''Creating a recursive feature eliminate function'''
-    
-    # initialize the ML algorithm
-    lm = LinearRegression()
+def get_elimination_order(X_train, y_train):
+
+    '''Function that runs recursive feature elimination for a linear regression 
+    (with intercept) all the way down, returning feature positions in the 
+    order they are eliminated (the last one is the strongest).
+
+    Like sklearn's RFE(LinearRegression()), each step drops the feature with 
+    the smallest |coefficient|. While the remaining features are collinear 
+    each step is a minimum-norm refit; from the first full-rank set on, the 
+    centered Gram matrix is inverted once and dropping feature j is a 
+    rank-one downdate of that inverse, so the coefficients of the remaining 
+    features follow without a refit:
+
+        A <- A - A[:, j] A[j, :] / A[j, j],   coef <- coef - A[:, j] coef[j] / A[j, j]'''
+
+    X = np.asarray(X_train, dtype = np.float64)
+    y = np.asarray(y_train, dtype = np.float64).ravel()
+
+    # center to absorb the intercept
+    X = X - X.mean(axis = 0)
+    y = y - y.mean()
+
+    remaining = np.arange(X.shape[1])
+    order = []
+
+    # rank-deficient sets (e.g. full one-hot blocks, collinear with the intercept 
+    # once centered) are refit each step with the minimum-norm lstsq solution 
+    # LinearRegression uses; the downdate is only valid once the set is full rank
+    coef, _, rank, _ = np.linalg.lstsq(X, y, rcond = None)
+
+    while len(remaining) and rank < len(remaining):
+
+        j = int(np.argmin(np.abs(coef)))
+        order.append(int(remaining[j]))
+
+        remaining = np.delete(remaining, j)
+
+        if len(remaining):
+            coef, _, rank, _ = np.linalg.lstsq(X[:, remaining], y, rcond = None)
+
+    if not len(remaining):
+        return order
+
+    X = X[:, remaining]
+
+    inverse = np.linalg.inv(X.T @ X)
+    coef = inverse @ (X.T @ y)
+
+    while len(remaining):
+
+        j = int(np.argmin(np.abs(coef)))
+        order.append(int(remaining[j]))
+
+        pivot = inverse[j, j]
+        keep = np.arange(len(remaining)) != j
+
+        coef = coef[keep] - inverse[keep, j] * (coef[j] / pivot)
+        inverse = inverse[np.ix_(keep, keep)] - np.outer(inverse[keep, j], inverse[j, keep]) / pivot
+        remaining = remaining[keep]
+
+    return order
+
 
-    rfe = RFE(lm, n_features_to_select = number_of_top_features)
+def recursive_feature_eliminate(X_train, y_train, number_of_top_features, elimination_order = None):
+    '''Creating a recursive feature eliminate function
 
-    # fit the data using RFE
-    rfe.fit(X_train, y_train) 
+    Rankings follow sklearn's RFE (the selected features rank 1). Pass the 
+    `elimination_order` from `get_elimination_order` to answer any 
+    `number_of_top_features` without refitting.'''
 
-    # get the mask of the columns selected
-    feature_mask = rfe.support_
+    if elimination_order is None:
+        elimination_order = get_elimination_order(X_train, y_train)
 
-    # get list of the column names
-    rfe_features = X_train.iloc[:,feature_mask].columns.tolist()
+    n_features = len(elimination_order)
 
-    # view list of columns and their ranking
-    # get the ranks using "rfe.ranking" method
-    variable_ranks = rfe.ranking_
+    # features eliminated last rank highest; the top `number_of_top_features` share rank 1
+    variable_ranks = np.empty(n_features, dtype = np.int64)
+    variable_ranks[elimination_order] = np.maximum(n_features - np.arange(n_features) - number_of_top_features + 1, 1)
 
     # get the variable names
     variable_names = X_train.columns.tolist()
@@ -2,6 +2,13 @@
 import pandas as pd
 import numpy as np
 import os
+import re
+import pickle
+import hashlib
+import time
+import warnings
+
+import schema
 
 # mathematical modules
 import math
@@ -19,7 +26,9 @@ from scipy.stats.mstats import winsorize
 
 # !iterative imputer must follow this import sequence!
 from sklearn.experimental import enable_iterative_imputer
-from sklearn.impute import IterativeImputer
+from sklearn.impute import IterativeImputer, KNNImputer
+from sklearn.linear_model import BayesianRidge
+from joblib import Parallel, delayed
 
 from sklearn.feature_selection import RFE
 from sklearn.linear_model import LinearRegression, LassoLars, TweedieRegressor, LogisticRegression
@@ -52,251 +61,117 @@ def avg_net_price(df):
 
 
 
+# major name -> major category buckets (first matching bucket wins)
+MAJOR_CATEGORIES = {
+    "Agriculture": ['Botany/Plant Biology.','Agricultural Engineering.','Applied Horticulture and Horticultural Business Services.','Agriculture/Veterinary Preparatory Programs.','Soil Sciences.','Agriculture, General.', 'Agriculture, Agriculture Operations, and Related Sciences, Other.', 'Agricultural Production Operations.', 'Agricultural and Domestic Animal Services.','Agricultural Public Services.','Agricultural Mechanization.','International Agriculture.','Agricultural and Food Products Processing.'],
+    "Environment and Natural Resources": ['Forest Engineering.','Environmental Control Technologies/Technicians.','Archeology.','Geological/Geophysical Engineering.','Mining and Mineral Engineering.','Natural Resources and Conservation, Other.','Fishing and Fisheries Sciences and Management.','Sustainability Studies.','Historic Preservation and Conservation.','Surveying Engineering.','Ocean Engineering.','Geography and Cartography.','Wildlife and Wildlands Science and Management.','Natural Resources Management and Policy.','Geological and Earth Sciences/Geosciences.','Environmental/Environmental Health Engineering.','Natural Resources Conservation and Research.','Forestry.'],
+    "Architecture": ['Drafting/Design Engineering Technologies/Technicians.','Architecture and Related Services, Other.','Architectural Sciences and Technology.','Interior Architecture.','Architectural Engineering.','Architecture.','Environmental Design.'],
+    "Area, Ethnic, and Civilization Studies": ['Demography and Population Studies.','Medieval and Renaissance Studies.','Classical and Ancient Studies.','Bilingual, Multilingual, and Multicultural Education.','Museology/Museum Studies.','Science, Technology and Society.','Urban Studies/Affairs.','Cultural Studies/Critical Theory and Analysis.','African Languages, Literatures, and Linguistics.', 'Turkic, Uralic-Altaic, Caucasian, and Central Asian Languages, Literatures, and Linguistics.'],
+    "Communications": ['Telecommunications Management.','Communication, Journalism, and Related Programs, Other.','Communication and Media Studies.','Public Relations, Advertising, and Applied Communication.'],
+    "Communication Technologies": ['Communications Technologies/Technicians and Support Services, Other.','Educational/Instructional Media Design.','Graphic Communications.','Communications Technology/Technician.','Audiovisual Communications Technologies/Technicians.','Radio, Television, and Digital Communication.'],
+    "Computer and Information Sciences": ['Accounting and Computer Science.','Human Computer Interaction.','Data Processing.','Computational Science.','Computer Software and Media Applications.','Computer and Information Sciences and Support Services, Other.','Computer Engineering Technologies/Technicians.','Computer Systems Analysis.','Computer Systems Networking and Telecommunications.','Computer Programming.','Computer/Information Technology Administration and Management.','Computer Science.','Information Science/Studies.','Computer Engineering.','Computer and Information Sciences, General.','Management Information Systems and Services.'],
+    "Cosmetology Services and Culinary Arts": ['Personal and Culinary Services, Other.','Cosmetology and Related Personal Grooming Services.','Nutrition Sciences.','Culinary Arts and Related Services.'],
+    "Education Administration and Teaching": ['Basic Skills and Developmental/Remedial Education.','Curriculum and Instruction.','High School/Secondary Diploma Programs.','High School/Secondary Certificate Programs.','Social and Philosophical Foundations of Education.','Teaching Assistants/Aides.','Student Counseling and Personnel Services.','Educational Administration and Supervision.','Teaching English or French as a Second or Foreign Language.','Education, Other.','Educational Assessment, Evaluation, and Research.','Education, General.','Special Education and Teaching.','Teacher Education and Professional Development, Specific Levels and Methods.','Teacher Education and Professional Development, Specific Subject Areas.'],
+    "Engineering": ['Ceramic Sciences and Engineering.','Electromechanical Engineering.','Biochemical Engineering.','Engineering Chemistry.','Mechatronics, Robotics, and Automation Engineering.','Engineering Mechanics.','Engineering Physics.','Engineering-Related Fields.','Engineering Science.','Petroleum Engineering.','Metallurgical Engineering.','Engineering, Other.','Industrial Engineering.','Chemical Engineering.','Aerospace, Aeronautical and Astronautical Engineering.','Engineering, General.','Electrical, Electronics and Communications Engineering.','Civil Engineering.','Mechanical Engineering.','Materials Engineering'],
+    "Engineering Technologies": ['Civil Engineering Technologies/Technicians.','Engineering-Related Technologies.','Engineering Technologies/Technicians, Other.','Engineering Technology, General.','Electrical Engineering Technologies/Technicians.','Mechanical Engineering Related Technologies/Technicians.','Construction Engineering Technologies.'],
+    "Linguistics and Foreign Languages": ['Iranian/Persian Languages, Literatures, and Linguistics.','Turkic, Uralic-Altaic, Caucasian, and Central Asian Languages, Literatures, and Linguistics.','African Languages, Literatures, and Linguistics.','Celtic Languages, Literatures, and Linguistics.','South Asian Languages, Literatures, and Linguistics.','Middle/Near Eastern and Semitic Languages, Literatures, and Linguistics.','American Sign Language.','Slavic, Baltic and Albanian Languages, Literatures, and Linguistics.','Foreign Languages, Literatures, and Linguistics, Other.','American Indian/Native American Languages, Literatures, and Linguistics.','East Asian Languages, Literatures, and Linguistics.','Germanic Languages, Literatures, and Linguistics.','Modern Greek Language and Literature.','Southeast Asian and Australasian/Pacific Languages, Literatures, and Linguistics.','Linguistic, Comparative, and Related Language Studies and Services.','Romance Languages, Literatures, and Linguistics.'],
+    "Family and Consumer Sciences": ['Work and Family Studies.','Family and Consumer Sciences/Human Sciences Business Services.','Family and Consumer Sciences/Human Sciences, General.','Family and Consumer Sciences/Human Sciences, Other.','Hospitality Administration/Management.','Family and Consumer Economics and Related Studies.'],
+    "Law": ['Law.','Legal Professions and Studies, Other.','Legal Research and Advanced Professional Studies.','Legal Support Services.','Non-Professional General Legal Studies (Undergraduate).'],
+    "English Language, Literature, and Composition": ['Creative Writing.','Publishing.','English Language and Literature/Letters, Other.','Literature.','Classics and Classical Languages, Literatures, and Linguistics.','English Language and Literature, General.','Journalism.'],
+    "Liberal Arts and Humanities": ['Liberal Arts and Sciences, General Studies and Humanities.'],
+    "Library Science": ['Library Science and Administration.','Library Science, Other.'],
+    "Biology and Life Sciences": ['Neuroscience.','Nanotechnology.','Biology Technician/Biotechnology Laboratory Technician.','Veterinary Medicine.','Maritime Studies.','Marine Sciences.','Pharmacology and Toxicology.','Human Biology.','Veterinary Biomedical and Clinical Sciences.','Atmospheric Sciences and Meteorology.','Biomathematics, Bioinformatics, and Computational Biology.','Cell/Cellular Biology and Anatomical Sciences.','Biological and Physical Sciences.','Biochemistry, Biophysics and Molecular Biology.','Zoology/Animal Biology.','Veterinary/Animal Health Technologies/Technicians.','Microbiological Sciences and Immunology.','Foods, Nutrition, and Related Services.','Ecology, Evolution, Systematics, and Population Biology.','Neurobiology and Neurosciences.','Genetics.','Animal Sciences.','Plant Sciences.','Food Science and Technology.','Chemistry.','Biology, General.','Biomedical/Medical Engineering.'],
+    "Mathematics and Statistics": ['Mathematics and Statistics, Other.','Mathematics and Computer Science.','Physics and Astronomy.','Statistics.','Mathematics.','Physics.','Astronomy and Astrophysics.','Applied Mathematics.'],
+    "Military Technologies": ['Military Science and Operational Studies.','Military Technologies and Applied Sciences, Other.','Air Force ROTC, Air Science and Operations.','Army ROTC, Military Science and Operations.','Intelligence, Command Control and Information Operations.','Naval Architecture and Marine Engineering.','Military Systems and Maintenance Technology.','Military Applied Sciences.','Security Science and Technology.'],
+    "Interdisciplinary and Multi-Disciplinary Studies (General)": ['International and Comparative Education.','Systems Science and Theory.','Intercultural/Multicultural and Diversity Studies.','International/Global Studies.','Multi-/Interdisciplinary Studies, General.','Multi/Interdisciplinary Studies, Other.','Area Studies.'],
+    "Physical Fitness, Parks, Recreation, and Leisure": ['Parks, Recreation and Leisure Facilities Management.','Movement and Mind-Body Therapies and Education.','Leisure and Recreational Activities.','Housing and Human Environments.','Landscape Architecture.','Outdoor Education.','Parks, Recreation, Leisure, and Fitness Studies, Other.','Health and Physical Education/Fitness.','Parks, Recreation and Leisure Studies.'],
+    "Philosophy and Religious Studies": ['Philosophy and Religious Studies, Other.','Philosophy and Religious Studies, General.','Religious Education.','Philosophy.','Bioethics/Medical Ethics.','Religious/Sacred Music.'],
+    "Theology and Religious Vocations": ['Theology and Religious Vocations, Other.','Theological and Ministerial Studies.','Missions/Missionary Studies and Missiology.','Religion/Religious Studies.','Bible/Biblical Studies.','Pastoral Counseling and Specialized Ministries.'],
+    "Physical Sciences": ['Somatic Bodywork and Related Therapeutic Services.','Energy and Biologically Based Therapies.','Physical Science Technologies/Technicians.','Physiology, Pathology and Related Sciences.','Natural Sciences.','Physical Sciences.','Physical Sciences, Other.'],
+    "Nuclear, Industrial Radiology, and Biological Technologies": ['Nuclear and Industrial Radiologic Technologies/Technicians.','Nuclear Engineering.','Nuclear Engineering Technologies/Technicians.','Science Technologies/Technicians, Other.','Electromechanical Instrumentation and Maintenance Technologies/Technicians.'],
+    "Psychology": ['Social Psychology.','Interpersonal and Social Skills.','Cognitive Science.','Biopsychology.','Research and Experimental Psychology.','Psychology, Other.','Clinical, Counseling and Applied Psychology.','Behavioral Sciences.','Clinical Psychology.','Human Development, Family Studies, and Related Services.'],
+    "Criminal Justice and Fire Protection": ['Homeland Security.','Homeland Security, Law Enforcement, Firefighting and Related Protective Services, Other.','International Relations and National Security Studies.','Fire Protection.','Criminal Justice and Corrections.','Criminology.'],
+    "Public Affairs, Policy, and Social Work": ['Security Policy and Strategy.','Taxation.','Citizenship Activities.','Peace Studies and Conflict Resolution.','Human Services, General.','Community Organization and Advocacy.','Mental and Social Health Services and Allied Professions.','Public Policy Analysis.','Public Administration and Social Service Professions, Other.','Public Administration.','Economics.','Rehabilitation and Therapeutic Professions.','City/Urban, Community and Regional Planning.','Social Work.','Political Science and Government.'],
+    "Social Sciences": ['Dispute Resolution.','Sociology and Anthropology.','Rural Sociology.','Social Sciences, General.','Communication Disorders Sciences and Services.','Human Development, Family Studies, and Related Services.','Sociology.','Psychology, General.','Ethnic, Cultural Minority, Gender, and Group Studies.','Anthropology.','Social Sciences, Other.'],
+    "Construction Services": ['Carpenters.','Mason/Masonry.','Construction Trades, Other.','Construction Trades, General.','Woodworking.','Electrical and Power Transmission Installers.','Construction Management.','Building/Construction Finishing, Management, and Inspection.','Architectural Engineering Technologies/Technicians.','Heating, Air Conditioning, Ventilation and Refrigeration Maintenance Technology/Technician (HAC, HACR, HVAC, HVACR).','Construction Engineering.'],
+    "Electrical and Mechanic Repairs and Technologies": ['Heavy/Industrial Equipment Maintenance Technologies.','Vehicle Maintenance and Repair Technologies.','Electrical/Electronics Maintenance and Repair Technology.','Science Technologies/Technicians, General.','Energy Systems Technologies/Technicians.'],
+    "Precision Production and Industrial Arts": ['Paper Science and Engineering.','Precision Metal Working.','Materials Sciences.','Systems Engineering.','Manufacturing Engineering.','Quality Control and Safety Technologies/Technicians.','Industrial Production Technologies/Technicians.','Polymer/Plastics Engineering.','Apparel and Textiles.','Textile Sciences and Engineering.'],
+    "Transportation Sciences and Technologies": ['Mining and Petroleum Technologies/Technicians.','Marine Transportation.','Air Transportation.','Transportation and Materials Moving, Other.'],
+    "Fine Arts": ['Crafts/Craft Design, Folk Art and Artisanry.','Visual and Performing Arts, Other.','Film/Video and Photographic Arts.','Visual and Performing Arts, General.','Design and Applied Arts.','Dance.','Rhetoric and Composition/Writing Studies.','Fine and Studio Arts.','Music.','Drama/Theatre Arts and Stagecraft.'],
+    "Medical and Health Sciences and Services": ['Medical Clinical Sciences/Graduate Medical Studies.','Dentistry.','Alternative and Complementary Medical Support Services.','Optometry.','Health-Related Knowledge and Skills.','Funeral Service and Mortuary Science.','Gerontology.','Ophthalmic and Optometric Support Services and Allied Professions.','Alternative and Complementary Medicine and Medical Systems.','Chiropractic.','Podiatric Medicine/Podiatry.','Advanced/Graduate Dentistry and Oral Sciences.','Alternative and Complementary Medicine and Medical Systems.''Biological and Biomedical Sciences, Other.','Practical Nursing, Vocational Nursing and Nursing Assistants.','Pharmacy, Pharmaceutical Sciences, and Administration.','Medicine.','Medical Illustration and Informatics.','Allied Health and Medical Assisting Services.','Dental Support Services and Allied Professions.','Health/Medical Preparatory Programs.','Biological/Biosystems Engineering.','Biotechnology.','Nursing.','Health Professions and Related Clinical Sciences, Other.','Dietetics and Clinical Nutrition Services.','Registered Nursing, Nursing Administration, Nursing Research and Clinical Nursing.','Clinical/Medical Laboratory Science/Research and Allied Professions.','Public Health.','Health Services/Allied Health/Health Sciences, General.','Health and Medical Administrative Services.','Allied Health Diagnostic, Intervention, and Treatment Professions.'],
+    "Business": ['Real Estate Development.','Operations Research.','Real Estate.','Insurance.','Specialized Sales, Merchandising and  Marketing Operations.','Arts, Entertainment,and Media Management.','Business Operations Support and Assistant Services.','Management Sciences and Quantitative Methods.','Business, Management, Marketing, and Related Support Services, Other.','Business/Commerce, General.','International Business.','Agricultural Business and Management.','Human Resources Management and Services.','General Sales, Merchandising and Related Marketing Operations.','Business/Managerial Economics.','Business/Corporate Communications.','Business Administration, Management and Operations.','Accounting and Related Services.','Entrepreneurial and Small Business Operations.','Finance and Financial Management Services.','Marketing.'],
+    "History": ['History.','Holocaust and Related Studies.','Architectural History and Criticism.']
+}
+
+# label for majors outside every bucket
+NO_MAJOR_CATEGORY = "None"
+
+# flat lookup table and fixed vocabulary built once at import
+# (buckets are walked in reverse so the first matching bucket wins)
+MAJOR_CATEGORY_LOOKUP = {
+    major_name: category
+    for category, major_names in reversed(list(MAJOR_CATEGORIES.items()))
+    for major_name in major_names
+}
+
+MAJOR_CATEGORY_VOCAB = list(MAJOR_CATEGORIES) + [NO_MAJOR_CATEGORY]
+
+
 def categorize_major(column):
 
     '''Function that places all major titles from `major_name` within 
-    more concise buckets/categories for dimensionality reduction.'''
-
-    if column in ['Botany/Plant Biology.','Agricultural Engineering.','Applied Horticulture and Horticultural Business Services.','Agriculture/Veterinary Preparatory Programs.','Soil Sciences.','Agriculture, General.', 'Agriculture, Agriculture Operations, and Related Sciences, Other.', 'Agricultural Production Operations.', 'Agricultural and Domestic Animal Services.','Agricultural Public Services.','Agricultural Mechanization.','International Agriculture.','Agricultural and Food Products Processing.']:
-        return "Agriculture"
-    elif column in ['Forest Engineering.','Environmental Control Technologies/Technicians.','Archeology.','Geological/Geophysical Engineering.','Mining and Mineral Engineering.','Natural Resources and Conservation, Other.','Fishing and Fisheries Sciences and Management.','Sustainability Studies.','Historic Preservation and Conservation.','Surveying Engineering.','Ocean Engineering.','Geography and Cartography.','Wildlife and Wildlands Science and Management.','Natural Resources Management and Policy.','Geological and Earth Sciences/Geosciences.','Environmental/Environmental Health Engineering.','Natural Resources Conservation and Research.','Forestry.']:
-        return "Environment and Natural Resources"
-    elif column in ['Drafting/Design Engineering Technologies/Technicians.','Architecture and Related Services, Other.','Architectural Sciences and Technology.','Interior Architecture.','Architectural Engineering.','Architecture.','Environmental Design.']:
-        return "Architecture"
-    elif column in ['Demography and Population Studies.','Medieval and Renaissance Studies.','Classical and Ancient Studies.','Bilingual, Multilingual, and Multicultural Education.','Museology/Museum Studies.','Science, Technology and Society.','Urban Studies/Affairs.','Cultural Studies/Critical Theory and Analysis.','African Languages, Literatures, and Linguistics.', 'Turkic, Uralic-Altaic, Caucasian, and Central Asian Languages, Literatures, and Linguistics.']:
-        return "Area, Ethnic, and Civilization Studies"
-    elif column in ['Telecommunications Management.','Communication, Journalism, and Related Programs, Other.','Communication and Media Studies.','Public Relations, Advertising, and Applied Communication.']:
-        return "Communications"
-    elif column in ['Communications Technologies/Technicians and Support Services, Other.','Educational/Instructional Media Design.','Graphic Communications.','Communications Technology/Technician.','Audiovisual Communications Technologies/Technicians.','Radio, Television, and Digital Communication.']:
-        return "Communication Technologies"
-    elif column in ['Accounting and Computer Science.','Human Computer Interaction.','Data Processing.','Computational Science.','Computer Software and Media Applications.','Computer and Information Sciences and Support Services, Other.','Computer Engineering Technologies/Technicians.','Computer Systems Analysis.','Computer Systems Networking and Telecommunications.','Computer Programming.','Computer/Information Technology Administration and Management.','Computer Science.','Information Science/Studies.','Computer Engineering.','Computer and Information Sciences, General.','Management Information Systems and Services.']:
-        return "Computer and Information Sciences"
-    elif column in ['Personal and Culinary Services, Other.','Cosmetology and Related Personal Grooming Services.','Nutrition Sciences.','Culinary Arts and Related Services.']:
-        return "Cosmetology Services and Culinary Arts"
-    elif column in ['Basic Skills and Developmental/Remedial Education.','Curriculum and Instruction.','High School/Secondary Diploma Programs.','High School/Secondary Certificate Programs.','Social and Philosophical Foundations of Education.','Teaching Assistants/Aides.','Student Counseling and Personnel Services.','Educational Administration and Supervision.','Teaching English or French as a Second or Foreign Language.','Education, Other.','Educational Assessment, Evaluation, and Research.','Education, General.','Special Education and Teaching.','Teacher Education and Professional Development, Specific Levels and Methods.','Teacher Education and Professional Development, Specific Subject Areas.']:
-        return "Education Administration and Teaching"
-    elif column in ['Ceramic Sciences and Engineering.','Electromechanical Engineering.','Biochemical Engineering.','Engineering Chemistry.','Mechatronics, Robotics, and Automation Engineering.','Engineering Mechanics.','Engineering Physics.','Engineering-Related Fields.','Engineering Science.','Petroleum Engineering.','Metallurgical Engineering.','Engineering, Other.','Industrial Engineering.','Chemical Engineering.','Aerospace, Aeronautical and Astronautical Engineering.','Engineering, General.','Electrical, Electronics and Communications Engineering.','Civil Engineering.','Mechanical Engineering.','Materials Engineering']:
-        return "Engineering"
-    elif column in ['Civil Engineering Technologies/Technicians.','Engineering-Related Technologies.','Engineering Technologies/Technicians, Other.','Engineering Technology, General.','Electrical Engineering Technologies/Technicians.','Mechanical Engineering Related Technologies/Technicians.','Construction Engineering Technologies.']:
-        return "Engineering Technologies"
-    elif column in ['Iranian/Persian Languages, Literatures, and Linguistics.','Turkic, Uralic-Altaic, Caucasian, and Central Asian Languages, Literatures, and Linguistics.','African Languages, Literatures, and Linguistics.','Celtic Languages, Literatures, and Linguistics.','South Asian Languages, Literatures, and Linguistics.','Middle/Near Eastern and Semitic Languages, Literatures, and Linguistics.','American Sign Language.','Slavic, Baltic and Albanian Languages, Literatures, and Linguistics.','Foreign Languages, Literatures, and Linguistics, Other.','American Indian/Native American Languages, Literatures, and Linguistics.','East Asian Languages, Literatures, and Linguistics.','Germanic Languages, Literatures, and Linguistics.','Modern Greek Language and Literature.','Southeast Asian and Australasian/Pacific Languages, Literatures, and Linguistics.','Linguistic, Comparative, and Related Language Studies and Services.','Romance Languages, Literatures, and Linguistics.']:
-        return "Linguistics and Foreign Languages"
-    elif column in ['Work and Family Studies.','Family and Consumer Sciences/Human Sciences Business Services.','Family and Consumer Sciences/Human Sciences, General.','Family and Consumer Sciences/Human Sciences, Other.','Hospitality Administration/Management.','Family and Consumer Economics and Related Studies.']:
-        return "Family and Consumer Sciences"
-    elif column in ['Law.','Legal Professions and Studies, Other.','Legal Research and Advanced Professional Studies.','Legal Support Services.','Non-Professional General Legal Studies (Undergraduate).']:
-        return "Law"
-    elif column in ['Creative Writing.','Publishing.','English Language and Literature/Letters, Other.','Literature.','Classics and Classical Languages, Literatures, and Linguistics.','English Language and Literature, General.','Journalism.']:
-        return "English Language, Literature, and Composition"
-    elif column in ['Liberal Arts and Sciences, General Studies and Humanities.']:
-        return "Liberal Arts and Humanities"
-    elif column in ['Library Science and Administration.','Library Science, Other.']:
-        return "Library Science"
-    elif column in ['Neuroscience.','Nanotechnology.','Biology Technician/Biotechnology Laboratory Technician.','Veterinary Medicine.','Maritime Studies.','Marine Sciences.','Pharmacology and Toxicology.','Human Biology.','Veterinary Biomedical and Clinical Sciences.','Atmospheric Sciences and Meteorology.','Biomathematics, Bioinformatics, and Computational Biology.','Cell/Cellular Biology and Anatomical Sciences.','Biological and Physical Sciences.','Biochemistry, Biophysics and Molecular Biology.','Zoology/Animal Biology.','Veterinary/Animal Health Technologies/Technicians.','Microbiological Sciences and Immunology.','Foods, Nutrition, and Related Services.','Ecology, Evolution, Systematics, and Population Biology.','Neurobiology and Neurosciences.','Genetics.','Animal Sciences.','Plant Sciences.','Food Science and Technology.','Chemistry.','Biology, General.','Biomedical/Medical Engineering.']:
-        return "Biology and Life Sciences"
-    elif column in ['Mathematics and Statistics, Other.','Mathematics and Computer Science.','Physics and Astronomy.','Statistics.','Mathematics.','Physics.','Astronomy and Astrophysics.','Applied Mathematics.']:
-        return "Mathematics and Statistics"
-    elif column in ['Military Science and Operational Studies.','Military Technologies and Applied Sciences, Other.','Air Force ROTC, Air Science and Operations.','Army ROTC, Military Science and Operations.','Intelligence, Command Control and Information Operations.','Naval Architecture and Marine Engineering.','Military Systems and Maintenance Technology.','Military Applied Sciences.','Security Science and Technology.']:
-        return "Military Technologies"
-    elif column in ['International and Comparative Education.','Systems Science and Theory.','Intercultural/Multicultural and Diversity Studies.','International/Global Studies.','Multi-/Interdisciplinary Studies, General.','Multi/Interdisciplinary Studies, Other.','Area Studies.']:
-        return "Interdisciplinary and Multi-Disciplinary Studies (General)"
-    elif column in ['Parks, Recreation and Leisure Facilities Management.','Movement and Mind-Body Therapies and Education.','Leisure and Recreational Activities.','Housing and Human Environments.','Landscape Architecture.','Outdoor Education.','Parks, Recreation, Leisure, and Fitness Studies, Other.','Health and Physical Education/Fitness.','Parks, Recreation and Leisure Studies.']:
-        return "Physical Fitness, Parks, Recreation, and Leisure"
-    elif column in ['Philosophy and Religious Studies, Other.','Philosophy and Religious Studies, General.','Religious Education.','Philosophy.','Bioethics/Medical Ethics.','Religious/Sacred Music.']:
-        return "Philosophy and Religious Studies"
-    elif column in ['Theology and Religious Vocations, Other.','Theological and Ministerial Studies.','Missions/Missionary Studies and Missiology.','Religion/Religious Studies.','Bible/Biblical Studies.','Pastoral Counseling and Specialized Ministries.']:
-        return "Theology and Religious Vocations"
-    elif column in ['Somatic Bodywork and Related Therapeutic Services.','Energy and Biologically Based Therapies.','Physical Science Technologies/Technicians.','Physiology, Pathology and Related Sciences.','Natural Sciences.','Physical Sciences.','Physical Sciences, Other.']:
-        return "Physical Sciences"
-    elif column in ['Nuclear and Industrial Radiologic Technologies/Technicians.','Nuclear Engineering.','Nuclear Engineering Technologies/Technicians.','Science Technologies/Technicians, Other.','Electromechanical Instrumentation and Maintenance Technologies/Technicians.']:
-        return "Nuclear, Industrial Radiology, and Biological Technologies"
-    elif column in ['Social Psychology.','Interpersonal and Social Skills.','Cognitive Science.','Biopsychology.','Research and Experimental Psychology.','Psychology, Other.','Clinical, Counseling and Applied Psychology.','Behavioral Sciences.','Clinical Psychology.','Human Development, Family Studies, and Related Services.']:
-        return "Psychology"
-    elif column in ['Homeland Security.','Homeland Security, Law Enforcement, Firefighting and Related Protective Services, Other.','International Relations and National Security Studies.','Fire Protection.','Criminal Justice and Corrections.','Criminology.']:
-        return "Criminal Justice and Fire Protection"
-    elif column in ['Security Policy and Strategy.','Taxation.','Citizenship Activities.','Peace Studies and Conflict Resolution.','Human Services, General.','Community Organization and Advocacy.','Mental and Social Health Services and Allied Professions.','Public Policy Analysis.','Public Administration and Social Service Professions, Other.','Public Administration.','Economics.','Rehabilitation and Therapeutic Professions.','City/Urban, Community and Regional Planning.','Social Work.','Political Science and Government.']:
-        return "Public Affairs, Policy, and Social Work"
-    elif column in ['Dispute Resolution.','Sociology and Anthropology.','Rural Sociology.','Social Sciences, General.','Communication Disorders Sciences and Services.','Human Development, Family Studies, and Related Services.','Sociology.','Psychology, General.','Ethnic, Cultural Minority, Gender, and Group Studies.','Anthropology.','Social Sciences, Other.']:
-        return "Social Sciences"
-    elif column in ['Carpenters.','Mason/Masonry.','Construction Trades, Other.','Construction Trades, General.','Woodworking.','Electrical and Power Transmission Installers.','Construction Management.','Building/Construction Finishing, Management, and Inspection.','Architectural Engineering Technologies/Technicians.','Heating, Air Conditioning, Ventilation and Refrigeration Maintenance Technology/Technician (HAC, HACR, HVAC, HVACR).','Construction Engineering.']:
-        return "Construction Services"
-    elif column in ['Heavy/Industrial Equipment Maintenance Technologies.','Vehicle Maintenance and Repair Technologies.','Electrical/Electronics Maintenance and Repair Technology.','Science Technologies/Technicians, General.','Energy Systems Technologies/Technicians.']:
-        return "Electrical and Mechanic Repairs and Technologies"
-    elif column in ['Paper Science and Engineering.','Precision Metal Working.','Materials Sciences.','Systems Engineering.','Manufacturing Engineering.','Quality Control and Safety Technologies/Technicians.','Industrial Production Technologies/Technicians.','Polymer/Plastics Engineering.','Apparel and Textiles.','Textile Sciences and Engineering.']:
-        return "Precision Production and Industrial Arts"
-    elif column in ['Mining and Petroleum Technologies/Technicians.','Marine Transportation.','Air Transportation.','Transportation and Materials Moving, Other.']:
-        return "Transportation Sciences and Technologies"
-    elif column in ['Crafts/Craft Design, Folk Art and Artisanry.','Visual and Performing Arts, Other.','Film/Video and Photographic Arts.','Visual and Performing Arts, General.','Design and Applied Arts.','Dance.','Rhetoric and Composition/Writing Studies.','Fine and Studio Arts.','Music.','Drama/Theatre Arts and Stagecraft.']:
-        return "Fine Arts"
-    elif column in ['Medical Clinical Sciences/Graduate Medical Studies.','Dentistry.','Alternative and Complementary Medical Support Services.','Optometry.','Health-Related Knowledge and Skills.','Funeral Service and Mortuary Science.','Gerontology.','Ophthalmic and Optometric Support Services and Allied Professions.','Alternative and Complementary Medicine and Medical Systems.','Chiropractic.','Podiatric Medicine/Podiatry.','Advanced/Graduate Dentistry and Oral Sciences.','Alternative and Complementary Medicine and Medical Systems.''Biological and Biomedical Sciences, Other.','Practical Nursing, Vocational Nursing and Nursing Assistants.','Pharmacy, Pharmaceutical Sciences, and Administration.','Medicine.','Medical Illustration and Informatics.','Allied Health and Medical Assisting Services.','Dental Support Services and Allied Professions.','Health/Medical Preparatory Programs.','Biological/Biosystems Engineering.','Biotechnology.','Nursing.','Health Professions and Related Clinical Sciences, Other.','Dietetics and Clinical Nutrition Services.','Registered Nursing, Nursing Administration, Nursing Research and Clinical Nursing.','Clinical/Medical Laboratory Science/Research and Allied Professions.','Public Health.','Health Services/Allied Health/Health Sciences, General.','Health and Medical Administrative Services.','Allied Health Diagnostic, Intervention, and Treatment Professions.']:
-        return "Medical and Health Sciences and Services"
-    elif column in ['Real Estate Development.','Operations Research.','Real Estate.','Insurance.','Specialized Sales, Merchandising and  Marketing Operations.','Arts, Entertainment,and Media Management.','Business Operations Support and Assistant Services.','Management Sciences and Quantitative Methods.','Business, Management, Marketing, and Related Support Services, Other.','Business/Commerce, General.','International Business.','Agricultural Business and Management.','Human Resources Management and Services.','General Sales, Merchandising and Related Marketing Operations.','Business/Managerial Economics.','Business/Corporate Communications.','Business Administration, Management and Operations.','Accounting and Related Services.','Entrepreneurial and Small Business Operations.','Finance and Financial Management Services.','Marketing.']:
-        return "Business"
-    elif column in ['History.','Holocaust and Related Studies.','Architectural History and Criticism.']:
-        return "History"
-    else:
-        return "None"
+    more concise buckets/categories for dimensionality reduction.
+
+    Scalar version of `categorize_majors`, kept for `Series.apply` use.'''
+
+    return MAJOR_CATEGORY_LOOKUP.get(column, NO_MAJOR_CATEGORY)
+
+
+
+def categorize_majors(major_names):
+
+    '''Function that buckets a whole `major_name` column at once, returning 
+    a pandas Categorical over the fixed `MAJOR_CATEGORY_VOCAB`.
+
+    The lookup runs once per distinct major name and is then broadcast 
+    over the column through its category codes.'''
+
+    names = pd.Categorical(major_names)
+
+    # vocab position of every distinct name; the trailing slot catches nulls (code -1)
+    vocab_codes = np.array(
+        [MAJOR_CATEGORY_VOCAB.index(categorize_major(name)) for name in names.categories] 
+        + [MAJOR_CATEGORY_VOCAB.index(NO_MAJOR_CATEGORY)],
+        dtype = np.int8)
+
+    return pd.Categorical.from_codes(vocab_codes[names.codes], categories = MAJOR_CATEGORY_VOCAB)
 
 
 
 # ---------- initial cleaning function ---------- #
 
 def clean_college_df(df):
-    '''Function to clean the intiail bachelor dataframe. This function takes 
-    in the bachelor dataframe and checks for instances of 'PrivacySuppressed' 
-    entries across the dataframe and replaces them with np.NaN.
+    '''Function to clean the intiail bachelor dataframe. 'PrivacySuppressed' 
+    entries are already NaN in the typed table from `acquire.get_bach_df` 
+    (see `acquire.get_suppression_masks`); any text columns still carrying 
+    the marker are converted to numeric here.
 
     function also renames/cleans columns names for easier readability.'''
 
-    # rename omitted entry values
-    new_df = df.apply(lambda x: x.replace({'PrivacySuppressed': np.NaN}, regex=True))
-
-    new_df = new_df.rename(columns = { 
-            "UNITID": "unit_id_institution",
-            "INSTNM_x": "college_name",
-            "CONTROL_x": "institution_control",
-            "STABBR": "state_post_code",
-            "ZIP": "zip_code",
-            "CITY": "city",
-            "REGION": "region_ipeds",
-            "OPEFLAG": "title_IV_eligibility",
-            "PREDDEG": "pred_degree",
-            "SCH_DEG": "pred_degree_0and4",
-            "CREDDESC": "degree_name",
-            "CREDLEV": "degree_code",
-            "CIPCODE": "major_code",
-            "CIPDESC": "major_name",
-            "NUMBRANCH": "branch_number",
-            "NPT4_PUB": "avg_net_price_public",
-            "NPT4_PRIV": "avg_net_price_private",
-            "NPT4_PROG": "avg_net_price_program",
-            "NPT4_OTHER": "avg_net_price_other",
-            'NUM41_PUB':'pub_fam_income_0_30000',
-            'NUM41_PRIV':'private_fam_income_0_30000',
-            'NUM41_PROG':'program_fam_income_0_30000',
-            'NUM41_OTHER':'other_fam_income_0_30000',
-            'NUM42_PUB':'pub_fam_income_30001_48000',
-            'NUM42_PRIV':'private_fam_income_30001_48000',
-            'NUM42_PROG':'program_fam_income_30001_48000',
-            'NUM42_OTHER':'other_fam_income_30001_48000',
-            'NUM43_PUB':'pub_fam_income_48001_75000',
-            'NUM43_PRIV':'private_fam_income_48001_75000',
-            'NUM43_PROG':'program_fam_income_48001_75000',
-            'NUM43_OTHER':'other_fam_income_48001_75000',
-            'NUM44_PUB':'pub_fam_income_75001_110000',
-            'NUM44_PRIV':'private_fam_income_75001_110000',
-            'NUM44_PROG':'program_fam_income_75001_110000',
-            'NUM44_OTHER':'other_fam_income_75001_110000',
-            'NUM45_PUB':'pub_fam_income_over_110000',
-            'NUM45_PRIV':'private_fam_income_over_110000',
-            'NUM45_PROG':'program_fam_income_over_110000',
-            'NUM45_OTHER':'other_fam_income_over_110000',
-            "NUM4_PRIV": "title_IV_student_number",
-            "TUITFTE": "full_time_net_tuition_revenue",
-            "ROOMBOARD_OFF": "off_campus_cost_of_attendace",
-            "ROOMBOARD_ON": "on_campus_cost_of_attendace",
-            "ADM_RATE": "admission_rate",
-            "GRADS": "graduate_number",
-            "ACTCMMID": "ACT_score_mid",
-            "SAT_AVG": "avg_sat_admitted",
-            "ADMCON7": "required_score",
-            "AVGFACSAL": "avg_faculty_salary",
-            "DISTANCEONLY": "online_only",
-            "C150_4": "comp_rt_ft_150over_expected_time",
-            "C150_4_2MOR": "comp_rt_ft_150over_expected_time_two_races",
-            "C150_4_AIAN": "comp_rt_ft_150over_expected_time_native_american",
-            "C150_4_ASIAN": "comp_rt_ft_150over_expected_time_asian",
-            "C150_4_BLACK": "comp_rt_ft_150over_expected_time_black",
-            "C150_4_HISP": "comp_rt_ft_150over_expected_time_hispanic",
-            "C150_4_NRA": "comp_rt_ft_150over_expected_time_non_resident",
-            "C150_4_UNKN": "comp_rt_ft_150over_expected_time_unknown_race",
-            "C150_4_WHITE": "comp_rt_ft_150over_expected_time_white",
-            "PFTFTUG1_EF": "share_entering_students_first_ft",
-            "PPTUG_EF": "share_of_part_time",
-            "RET_FT4": "first_time_ft_student_retention",
-            "RET_PT4": "first_time_pt_student_retention",
-            "UGDS_2MOR": "enrollment_share_two_races",
-            "UGDS_AIAN": "enrollment_share_native_american",
-            "UGDS_ASIAN": "enrollment_share_asian",
-            "UGDS_BLACK": "enrollment_share_black",
-            "UGDS_HISP": "enrollment_share_hispanic",
-            "UGDS_NHPI": "enrollment_share_pac_islander",
-            "UGDS_NRA": "enrollment_share_non_resident",
-            "UGDS_UNKN": "enrollment_share_unknown",
-            "UGDS_WHITE": "enrollment_share_white",
-            "D_PCTPELL_PCTFLOAN": "undergraduate_number_pell_grant_fedral_loan",
-            "DEBT_MDN": "median_loan_repayment",
-            "PELL_DEBT_MDN": "med_debt_pell_students",
-            "LO_INC_DEBT_MDN": "median_debt_0_30000",
-            "MD_INC_DEBT_MDN": "median_debt_30001_75000",
-            "HI_INC_DEBT_MDN": "median_debt_75001+",
-            "GRAD_DEBT_MDN": "median_debt_completed",
-            "WDRAW_DEBT_MDN": "not_completed_med_debt",
-            "MALE_DEBT_MDN": "median_debt_male",
-            "FEMALE_DEBT_MDN": "median_debt_female",
-            "IND_DEBT_MDN": "median_debt_independent",
-            "FIRSTGEN_DEBT_MDN": "median_debt_first_generation",
-            "NOTFIRSTGEN_DEBT_MDN": "median_debt_non_first_generation",
-            "NOPELL_DEBT_MDN": "median_debt_non_pell",
-            "FTFTPCTFLOAN": "fedral_loan_full_time_first_time_undergraduate",
-            "FTFTPCTPELL": "pell_grant_full_time_first_time_undergraduate",
-            "DEBT_PELL_PP_EVAL_MDN": "med_parent_and_pell",
-            "DEBT_PELL_PP_EVAL_MEAN": "avg_parent_and_pell",
-            "DEBT_PELL_STGP_EVAL_MDN": "med_stafford_and_pell",
-            "DEBT_PELL_STGP_EVAL_MEAN": "avg_stafford_and_pell",
-            "DEBT_ALL_PP_EVAL_MDN": "med_parent_and_loan",
-            "DEBT_ALL_PP_EVAL_MEAN": "avg_parent_and_loan",
-            "DEBT_ALL_STGP_EVAL_MDN": "med_stafford_and_debt",
-            "DEBT_ALL_STGP_EVAL_MEAN": "avg_stafford_and_debt",
-            "DEBT_ALL_STGP_EVAL_MDN10YRPAY": "med_stafford_and_grad_debt",
-            "DEBT_NOPELL_STGP_EVAL_MDN": "med_stafford_and_no_pell_recipients",
-            "DEBT_NOPELL_STGP_EVAL_MEAN": "avg_stafford_and_no_pell_recipients",
-            "DEBT_ALL_PP_EVAL_MDN10YRPAY": "med_monthly_payment_parent_and_debt",
-            "PCIP01": "deg_percent_awarded_agriculture_operations",
-            "PCIP03": "deg_percent_awarded_natural_resources",
-            "PCIP04": "deg_percent_awarded_architecture",
-            "PCIP05": "deg_percent_awarded_area_ethnic_cultural_gender",
-            "PCIP09": "deg_percent_awarded_communication_journalism",
-            "PCIP10": "deg_percent_awarded_communication_tech",
-            "PCIP11": "deg_percent_awarded_computer_science",
-            "PCIP12": "deg_percent_awarded_personal_culinary_services",
-            "PCIP13": "deg_percent_awarded_education",
-            "PCIP14": "deg_percent_awarded_engineering",
-            "PCIP15": "deg_percent_awarded_engineering_tech",
-            "PCIP16": "deg_percent_awarded_foreign_language_literatures",
-            "PCIP19": "deg_percent_awarded_human_science",
-            "PCIP22": "deg_percent_awarded_legal_profession",
-            "PCIP23": "deg_percent_awarded_english_lang",
-            "PCIP24": "deg_percent_awarded_general_studies",
-            "PCIP25": "deg_percent_awarded_library_sciences",
-            "PCIP26": "deg_percent_awarded_bio_sciences",
-            "PCIP27": "deg_percent_awarded_mathematics",
-            "PCIP29": "deg_percent_awarded_military_tech",
-            "PCIP30": "deg_percent_awarded_intedisciplinary_studies",
-            "PCIP31": "deg_percent_awarded_leisure_fitness",
-            "PCIP38": "deg_percent_awarded_philosophy",
-            "PCIP39": "deg_percent_awarded_theology",
-            "PCIP40": "deg_percent_awarded_physical_sciences",
-            "PCIP41": "deg_percent_awarded_science_tech",
-            "PCIP42": "deg_percent_awarded_psychology",
-            "PCIP43": "deg_percent_awarded_homeland_security",
-            "PCIP44": "deg_percent_awarded_public_admin",
-            "PCIP45": "deg_percent_awarded_social_sciences",
-            "PCIP46": "deg_percent_awarded_construction_trades",
-            "PCIP47": "deg_percent_awarded_mechanic_repair",
-            "PCIP48": "deg_percent_awarded_precision_production",
-            "PCIP49": "deg_percent_awarded_transportation_materials",
-            "PCIP50": "deg_percent_awarded_visual_and_performing_arts",
-            "PCIP51": "deg_percent_awarded_health",
-            "PCIP52": "deg_percent_awarded_business_management",
-            "PCIP54": "deg_percent_awarded_history",
-            "UGNONDS": "non_deg_seeking"
-        })
+    # convert text columns that still carry the suppression marker
+    text_cols = df.select_dtypes(include = "object").columns
+    suppressed_cols = [col for col in text_cols if (df[col] == 'PrivacySuppressed').any()]
+
+    new_df = df.assign(**{col: pd.to_numeric(df[col], errors = "coerce") for col in suppressed_cols})
+
+    # friendly column names are kept in the schema registry
+    new_df = new_df.rename(columns = schema.FRIENDLY_NAMES)
 
     # collapse average net price by institution control columns
     new_df = avg_net_price(new_df)
 
     # create the 'major_category' bin column
-    new_df['major_category'] = new_df["major_name"].apply(categorize_major)
+    new_df['major_category'] = categorize_majors(new_df["major_name"])
 
     # impute university id with feature mode
     new_df["unit_id_institution"] = new_df["unit_id_institution"].fillna(new_df["unit_id_institution"].mode()[0])
@@ -306,22 +181,20 @@ def clean_college_df(df):
     new_df["city"] = new_df["city"].fillna(new_df["city"].mode()[0])
     new_df["zip_code"] = new_df["zip_code"].fillna(new_df["zip_code"].mode()[0])
 
-    # updating median debt non-first generation dtype to int and replacing null w. median value
-    new_df.loc[new_df['median_debt_non_first_generation'].notnull(), 'median_debt_non_first_generation'] = new_df.loc[new_df['median_debt_non_first_generation'].notnull(), 'median_debt_non_first_generation'].apply(int)
+    # truncating median debt non-first generation to whole dollars and replacing null w. median value
+    new_df['median_debt_non_first_generation'] = np.trunc(new_df['median_debt_non_first_generation'])
     new_df['median_debt_non_first_generation'] = new_df['median_debt_non_first_generation'].fillna(new_df['median_debt_non_first_generation'].median())
 
-    return new_df
+    # compact dtypes (float32, small ints, categoricals)
+    return compact_dtypes(new_df)
 
 # -------------------------------------- #
 
-def fill_null_with_mean(df):
+def fill_null_with_mean(df, fitted = None):
 
     '''Function to fill-in a by major average for entrance exams/admissions rate.'''
-    
-    df['admission_rate'] = df.groupby('major_category')['admission_rate'].apply(lambda x:x.fillna(x.mean()))
-    df['ACT_score_mid'] = df.groupby('major_category')['ACT_score_mid'].apply(lambda x:x.fillna(x.mean()))
-    df['avg_sat_admitted'] = df.groupby('major_category')['avg_sat_admitted'].apply(lambda x:x.fillna(x.mean()))
-    return df
+
+    return impute_group_columns(df, ['admission_rate', 'ACT_score_mid', 'avg_sat_admitted'], fitted)
 
 
 def clean_high_percentage_nulls(df):
@@ -362,7 +235,7 @@ def clean_high_percentage_nulls(df):
     new_df = fill_null_with_mean(new_df)
 
     # print the new df
-    print(f'dataframe shape: {new_df.shape}')
+    print_frame_report(new_df)
 
     # return the new df
     return new_df
@@ -394,7 +267,7 @@ def treat_bach_nulls(df):
                 axis=1, 
                 thresh = min_count)
 
-    print(f'modified dataframe shape: {mod_df.shape}')
+    print_frame_report(mod_df, 'modified dataframe')
     
     # return the new df
     return mod_df
@@ -408,21 +281,33 @@ def treat_bach_nulls(df):
 # --> new_df['major_category'] = new_df.major_name.apply(categorize_major)
 # ----------------------------------- #
 
-def obtain_target_variables(df):
+def merge_earnings(df, filename = None):
 
-    '''Function to perform merge with `earnings_pivot_merge` df'''
+    '''Function that merges yearly earnings by `major_category` onto the df.
+    Run once before `roi_scenarios` / `sweep_roi_scenarios` sensitivity sweeps.
+
+    `filename` defaults to EARNINGS_PIVOT; pass a pivot written by 
+    `ipums.write_earnings_pivot` to use other years (its year columns are 
+    picked up by value, see `get_earning_years`).'''
 
     # Reading in csv of earnings pivot table (creation of Chenchen)
-    earnings_pivot_merge = pd.read_csv('2017_2018_2019_earning_by_major.csv', index_col=0)
+    earnings_pivot_merge = pd.read_csv(filename or EARNINGS_PIVOT, index_col=0)
 
     # Merging cleaned/prepared df with earnings pivot table
-    df = df.merge(earnings_pivot_merge, how='inner', on='major_category')
+    return df.merge(earnings_pivot_merge, how='inner', on='major_category')
+
+
+def obtain_target_variables(df, earnings_filename = None):
+
+    '''Function to perform merge with `earnings_pivot_merge` df'''
+
+    df = merge_earnings(df, earnings_filename)
 
     # get target variables
     new_df = create_roi_cols(df).round(4)
 
     # print dataframe shape
-    print(f'dataframe shape: {new_df.shape}')
+    print_frame_report(new_df)
 
     # return the newly transformed dataframe
     return new_df
@@ -434,113 +319,197 @@ def obtain_target_variables(df):
 
 ''' These features intake calculated median earnings data from our secondary IPUMS dataset by year (`median_earnings_by_degree`), 
 net college cost of a typical 4-yr bachelors degree, and predicted counter earnings had an individual not pursued this degree. 
-It utilizes a standard ROI formula calculation to engineer new ROI vars for 5, 10, and 20 years.
+It utilizes a standard ROI formula calculation to engineer new ROI vars for 5, 10, and 20 years (any 1-40 year horizon via `roi_matrix`).
 This is our primary target variable'''
 
-# 5-yr ROI 
+# ROI assumptions
+EARNINGS_PIVOT = '2017_2018_2019_earning_by_major.csv'   # one column per observed year, e.g. '2019'
+EARNINGS_GROWTH = 1.02                     # yearly wage growth after the last observed year
+COUNTERFACTUAL_EARNINGS = 39070            # yearly wage had an individual foregone this degree
+PROGRAM_YEARS = 4                          # years of net price and foregone wages
+ROI_HORIZONS = [5, 10, 20]
 
-def roi_5yr(df):
 
-    # creating median earnings var
-    median_earnings_by_degree_5yr = (df['2017'] + df['2018'] + df['2019'] + df['2019']*1.02 + (df['2019']*1.02)*1.02)
+def get_earning_years(df):
 
-    # net college cost var
-    net_college_cost = df['avg_net_price']*4
+    '''Function that returns the observed-earnings year columns of an 
+    earnings-merged df (columns named by a 4-digit year), oldest first.'''
 
-    # counter earnings var (what is the predicted wage an individual would have earned had they foregone pursuing this degree)
-    counter_earnings = (39070*4)
+    return sorted((col for col in df.columns if re.fullmatch(r"\d{4}", str(col))), key = int)
 
-    # 
-    net_cost_of_investment = (net_college_cost + counter_earnings)
 
-    #
-    net_return_on_investment_5yr = median_earnings_by_degree_5yr - net_cost_of_investment
+def get_growth_factors(horizons, n_observed, growth_rates):
 
+    '''Function that returns a growth rates x horizons array of multipliers 
+    on the latest observed earnings, one per projected-year sum.
 
-    # ROI formula calculation
-    df['roi_5yr'] = net_return_on_investment_5yr / net_cost_of_investment
+    Projecting k years beyond the observed ones at growth g sums to 
+    latest * g * (g**k - 1) / (g - 1) (the geometric series closed form), or 
+    latest * k when g == 1.'''
 
+    horizons = np.asarray(horizons, dtype = np.int64)
 
-    # ROI calculation as a percentage
-    df['pct_roi_5yr'] = (net_return_on_investment_5yr / net_cost_of_investment) * 100
+    if (horizons < 1).any():
+        raise ValueError("ROI horizons must be at least 1 year")
 
-    return df
+    growth_rates = np.asarray(growth_rates, dtype = np.float64).reshape(-1, 1)
 
+    projected_years = np.maximum(horizons - n_observed, 0)
 
-# 10-yr ROI
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        growth_factors = growth_rates * (growth_rates ** projected_years - 1) / (growth_rates - 1)
 
-def roi_10yr(df):
+    return np.where(growth_rates == 1, projected_years, growth_factors)
 
-    # creating median earnings var
-    median_earnings_by_degree_10yr = df['2017'] + df['2018'] + df['2019'] + df['2019']*1.02 + (df['2019']*1.02)*1.02 + ((df['2019']*1.02)*1.02)*1.02 + (((df['2019']*1.02)*1.02)*1.02)*1.02 + ((((df['2019']*1.02)*1.02)*1.02)*1.02)*1.02 + (((((df['2019']*1.02)*1.02)*1.02)*1.02)*1.02)*1.02 + ((((((df['2019']*1.02)*1.02)*1.02)*1.02)*1.02)*1.02)*1.02
 
-    # net college cost var
-    net_college_cost = df['avg_net_price']*4
+def get_observed_earnings(earnings, horizons):
 
-    # counter earnings var (what is the predicted wage an individual would have earned had they foregone pursuing this degree)
-    counter_earnings = (39070*4)
+    '''Function that returns the cumulative observed earnings up to each 
+    horizon (programs x horizons), along with the programs x observed-years 
+    earnings block as float64.'''
 
-    # 
-    net_cost_of_investment = (net_college_cost + counter_earnings)
+    earnings = np.asarray(earnings, dtype = np.float64)
+    earnings = earnings.reshape(len(earnings), -1)
 
-    #
-    net_return_on_investment_10yr = median_earnings_by_degree_10yr - net_cost_of_investment
+    horizons = np.asarray(horizons, dtype = np.int64)
 
+    observed = np.cumsum(earnings, axis = 1)[:, np.clip(horizons, 1, earnings.shape[1]) - 1]
 
-    # ROI formula calculation
-    df['roi_10yr'] = net_return_on_investment_10yr / net_cost_of_investment
+    return observed, earnings
 
-    # ROI calculation as a percentage
-    df['pct_roi_10yr'] = (net_return_on_investment_10yr / net_cost_of_investment) * 100
 
-    return df
+def roi_matrix(earnings, net_price, horizons = ROI_HORIZONS, growth = EARNINGS_GROWTH, 
+               counterfactual_earnings = COUNTERFACTUAL_EARNINGS, program_years = PROGRAM_YEARS):
 
+    '''Function that computes ROI for every program and horizon in one broadcast,
+    returning a programs x horizons array.
 
+    `earnings` is a programs x observed-years block (oldest year first). A horizon 
+    of h years sums the first h observed years, then grows the latest observed year 
+    by `growth` for each remaining year (see `get_growth_factors`).
 
-# 20-yr ROI
+    ROI = (earnings over the horizon - net cost) / net cost, where the net cost is 
+    `program_years` of net price plus foregone (counterfactual) earnings.'''
 
-def roi_20yr(df):
+    observed, earnings = get_observed_earnings(earnings, horizons)
 
-    # creating median earnings var                                                                                                                                                                                          yr10                   yr11                                                                                     yr15
-    median_earnings_by_degree_20yr = df['2017'] + df['2018'] + df['2019'] + df['2019']*1.02 + df['2019']*(1.02**2) + df['2019']*(1.02**3) + df['2019']*(1.02**4) + df['2019']*(1.02**5) + df['2019']*(1.02**6) + df['2019']*(1.02**7) + df['2019']*(1.02**8) + df['2019']*(1.02**9) + df['2019']*(1.02**10) + df['2019']*(1.02**11) + df['2019']*(1.02**12) + df['2019']*(1.02**13) + df['2019']*(1.02**14) + df['2019']*(1.02**15) + df['2019']*(1.02**16) + df['2019']*(1.02**17)
+    growth_factors = get_growth_factors(horizons, earnings.shape[1], [growth])[0]
 
-    # net college cost var
-    net_college_cost = df['avg_net_price']*4
+    total_earnings = observed + earnings[:, -1:] * growth_factors
 
-    # counter earnings var (what is the predicted wage an individual would have earned had they foregone pursuing this degree)
-    counter_earnings = (39070*4)
+    # net cost of investment
+    net_cost = (np.asarray(net_price, dtype = np.float64) + counterfactual_earnings) * program_years
 
-    # 
-    net_cost_of_investment = (net_college_cost + counter_earnings)
+    return total_earnings / net_cost[:, None] - 1
 
-    #
-    net_return_on_investment_20yr = median_earnings_by_degree_20yr - net_cost_of_investment
 
+def roi_scenarios(earnings, net_price, growth_rates = [EARNINGS_GROWTH], 
+                  counterfactual_earnings = [COUNTERFACTUAL_EARNINGS], horizons = ROI_HORIZONS, 
+                  program_years = PROGRAM_YEARS, chunk_size = 50_000, dtype = np.float32):
 
-    # ROI formula calculation
-    df['roi_20yr'] = net_return_on_investment_20yr / net_cost_of_investment
+    '''Function that evaluates ROI for every program under every combination of 
+    wage growth, counterfactual wage and horizon in one vectorized pass.
 
-    # ROI calculation as a percentage
-    df['pct_roi_20yr'] = (net_return_on_investment_20yr / net_cost_of_investment) * 100
+    Returns a programs x growth x counterfactual x horizon array (float32 by 
+    default) and the matching axis labels. Programs are processed `chunk_size` 
+    rows at a time so the float64 intermediates stay bounded on large grids.'''
 
-    return df
+    observed, earnings = get_observed_earnings(earnings, horizons)
+
+    growth_factors = get_growth_factors(horizons, earnings.shape[1], growth_rates)
+
+    counterfactual = np.asarray(counterfactual_earnings, dtype = np.float64)
+
+    net_price = np.asarray(net_price, dtype = np.float64)
+
+    n_programs = len(earnings)
+
+    cube = np.empty((n_programs, len(growth_factors), len(counterfactual), len(horizons)), dtype = dtype)
+
+    for start in range(0, n_programs, chunk_size):
+
+        stop = start + chunk_size
+
+        # programs x growth x horizon
+        total_earnings = observed[start:stop, None, :] + earnings[start:stop, -1, None, None] * growth_factors
+
+        # programs x counterfactual
+        net_cost = (net_price[start:stop, None] + counterfactual) * program_years
+
+        cube[start:stop] = total_earnings[:, :, None, :] / net_cost[:, None, :, None] - 1
+
+    axes = {
+        'program': np.arange(n_programs),
+        'growth': np.asarray(growth_rates, dtype = np.float64),
+        'counterfactual_earnings': counterfactual,
+        'horizon': np.asarray(horizons, dtype = np.int64)}
+
+    return cube, axes
+
+
+def sweep_roi_scenarios(df, growth_rates, counterfactual_earnings, horizons = ROI_HORIZONS, 
+                        program_years = PROGRAM_YEARS, chunk_size = 50_000, years = None):
+
+    '''Function that runs `roi_scenarios` on an earnings-merged df (see 
+    `merge_earnings`), labeling the program axis with the df index. `years` 
+    defaults to every year column of the df (`get_earning_years`).'''
+
+    cube, axes = roi_scenarios(
+        df[years or get_earning_years(df)], 
+        df['avg_net_price'], 
+        growth_rates, 
+        counterfactual_earnings, 
+        horizons, 
+        program_years, 
+        chunk_size)
+
+    axes['program'] = df.index.to_numpy()
+
+    return cube, axes
 
 
 ### Master function for all roi vars ###
-def create_roi_cols(df):
+def create_roi_cols(df, horizons = ROI_HORIZONS, growth = EARNINGS_GROWTH, 
+                    counterfactual_earnings = COUNTERFACTUAL_EARNINGS, program_years = PROGRAM_YEARS, years = None):
+
+    '''Function that adds `roi_<h>yr` and `pct_roi_<h>yr` columns for each 
+    horizon, computed together by `roi_matrix`. `years` defaults to every 
+    year column of the df (`get_earning_years`), so a newly ingested ACS 
+    year is picked up without code changes.'''
 
-    # Calling roi_5yr function
-    df = roi_5yr(df)
+    roi = roi_matrix(
+        df[years or get_earning_years(df)], 
+        df['avg_net_price'], 
+        horizons, 
+        growth, 
+        counterfactual_earnings, 
+        program_years)
 
-    # Calling roi_10yr function
-    df = roi_10yr(df)
+    for i, horizon in enumerate(horizons):
 
-    # Calling roi_10yr function
-    df = roi_20yr(df)
+        # ROI formula calculation
+        df[f'roi_{horizon}yr'] = roi[:, i]
+
+        # ROI calculation as a percentage
+        df[f'pct_roi_{horizon}yr'] = roi[:, i] * 100
 
     return df
 
 
+# single-horizon helpers
+
+def roi_5yr(df):
+    return create_roi_cols(df, horizons = [5])
+
+
+def roi_10yr(df):
+    return create_roi_cols(df, horizons = [10])
+
+
+def roi_20yr(df):
+    return create_roi_cols(df, horizons = [20])
+
+
 # --------------------------------------------- #
         # Additional Feature Engineering 
 # --------------------------------------------- #
@@ -562,133 +531,445 @@ def get_fam_income_col(df, col_lst, new_col_string):
     # return the dataframe
     return df
 
+
+# column families: family -> how to reduce and {new column: [member columns]}
+# both reductions skip missing members; a group with every member missing is 
+# NaN unless the family sets a "fill" (fam_income counts fill 0, as the 
+# original `get_fam_income_col` fillna(0) + sum did)
+INCOME_BRACKETS = ['0_30000', '30001_48000', '48001_75000', '75001_110000', 'over_110000']
+
+COMPLETION_PREFIX = 'comp_rt_ft_150over_expected_time_'
+
+COLUMN_FAMILIES = {
+    # family income brackets merged across `institution_control`
+    "fam_income": {
+        "reduce": "sum",
+        "fill": 0,
+        "columns": {
+            f'income_{bracket}': [f'{control}_fam_income_{bracket}' for control in ['other', 'private', 'program', 'pub']]
+            for bracket in INCOME_BRACKETS}},
+
+    # C150_4_* completion rates by race; an unweighted mean of the member rates, 
+    # since the per-race cohort sizes (D150_4_*) are not acquired
+    "completion_by_race": {
+        "reduce": "mean",
+        "columns": {
+            f'{COMPLETION_PREFIX}underrepresented': [COMPLETION_PREFIX + race for race in ['black', 'hispanic', 'native_american', 'two_races']],
+            f'{COMPLETION_PREFIX}other_races': [COMPLETION_PREFIX + race for race in ['asian', 'white', 'non_resident', 'unknown_race']]}},
+
+    # UGDS_* undergraduate enrollment shares
+    "enrollment_share": {
+        "reduce": "sum",
+        "columns": {
+            'enrollment_share_underrepresented': ['enrollment_share_' + race for race in ['black', 'hispanic', 'native_american', 'pac_islander', 'two_races']],
+            'enrollment_share_other_races': ['enrollment_share_' + race for race in ['asian', 'white', 'non_resident', 'unknown']]}},
+
+    # PCIP* share of degrees awarded
+    "deg_percent_awarded": {
+        "reduce": "sum",
+        "columns": {
+            f'deg_percent_awarded_{group}': [f'deg_percent_awarded_{field}' for field in fields]
+            for group, fields in {
+                'stem': ['agriculture_operations', 'natural_resources', 'computer_science', 'engineering', 'engineering_tech', 
+                         'bio_sciences', 'mathematics', 'physical_sciences', 'science_tech'],
+                'business_comm': ['business_management', 'communication_journalism', 'communication_tech'],
+                'health': ['health'],
+                'education': ['education'],
+                'humanities_arts': ['area_ethnic_cultural_gender', 'foreign_language_literatures', 'english_lang', 'general_studies', 
+                                    'intedisciplinary_studies', 'philosophy', 'theology', 'visual_and_performing_arts', 'history', 
+                                    'library_sciences', 'architecture'],
+                'social_public_service': ['human_science', 'legal_profession', 'psychology', 'homeland_security', 'public_admin', 
+                                          'social_sciences', 'leisure_fitness'],
+                'trades': ['personal_culinary_services', 'military_tech', 'construction_trades', 'mechanic_repair', 
+                           'precision_production', 'transportation_materials']}.items()}}
+}
+
+
+def collapse_column_families(df, families = list(COLUMN_FAMILIES), registry = COLUMN_FAMILIES, drop = True):
+
+    '''Function that collapses each family of columns in one pass.
+
+    All member columns are read into a single float block once; each family 
+    is gathered into a rows x new columns x members 3-D block (ragged groups 
+    padded with NaN) and reduced along the last axis, ignoring missing 
+    members; a group whose members are all missing is NaN, or the family's 
+    "fill" value. New columns are added, and members dropped, with one concat 
+    instead of a copy per group.'''
+
+    specs = [registry[family] for family in families]
+
+    members = list(dict.fromkeys(col for spec in specs for cols in spec["columns"].values() for col in cols))
+
+    # trailing all-NaN column pads ragged groups
+    block = np.empty((len(df), len(members) + 1), dtype = np.float64)
+    block[:, :-1] = df[members].to_numpy(dtype = np.float64, na_value = np.nan)
+    block[:, -1] = np.nan
+
+    position = {col: i for i, col in enumerate(members)}
+
+    collapsed = {}
+
+    for spec in specs:
+
+        groups = spec["columns"]
+        width = max(len(cols) for cols in groups.values())
+
+        gather = np.full((len(groups), width), len(members))
+        for i, cols in enumerate(groups.values()):
+            gather[i, :len(cols)] = [position[col] for col in cols]
+
+        family_block = block[:, gather]
+
+        if spec["reduce"] == "sum":
+            # min_count = 1: a group with every member missing stays NaN, not 0
+            reduced = np.where(np.isnan(family_block).all(axis = 2), np.nan, np.nansum(family_block, axis = 2))
+        else:
+            with np.errstate(invalid = 'ignore'), warnings.catch_warnings():
+                warnings.simplefilter('ignore', category = RuntimeWarning)
+                reduced = np.nanmean(family_block, axis = 2)
+
+        if "fill" in spec:
+            reduced = np.where(np.isnan(reduced), spec["fill"], reduced)
+
+        collapsed.update(zip(groups, reduced.T))
+
+    if drop:
+        df = df.drop(columns = members)
+
+    return pd.concat([df, pd.DataFrame(collapsed, index = df.index)], axis = 1)
+
+
 def create_fam_income_columns(df):
-    
-    # income brackets
-    income_0_30000 = [
-        'other_fam_income_0_30000',
-        'private_fam_income_0_30000',
-        'program_fam_income_0_30000',
-        'pub_fam_income_0_30000']
-
-    income_30001_48000 = [
-        'other_fam_income_30001_48000',
-        'private_fam_income_30001_48000',
-        'program_fam_income_30001_48000',
-        'pub_fam_income_30001_48000']
-
-    income_48001_75000 = [
-        'other_fam_income_48001_75000',
-        'private_fam_income_48001_75000',
-        'program_fam_income_48001_75000',
-        'pub_fam_income_48001_75000']
-
-    income_75001_110000 = [
-        'other_fam_income_75001_110000',
-        'private_fam_income_75001_110000',
-        'program_fam_income_75001_110000',
-        'pub_fam_income_75001_110000']
-
-    income_over_110000 = [
-        'other_fam_income_over_110000',
-        'private_fam_income_over_110000',
-        'program_fam_income_over_110000',
-        'pub_fam_income_over_110000']
-
-    # list of cols to collapse
-    frames = [
-        income_0_30000,
-        income_30001_48000, 
-        income_48001_75000, 
-        income_75001_110000, 
-        income_over_110000]
-
-    # list of new col names
-    var_names = [
-        'income_0_30000',
-        'income_30001_48000', 
-        'income_48001_75000', 
-        'income_75001_110000', 
-        'income_over_110000']
-
-    for i in range(len(frames)):
-        var_name = var_names[i]
-        df = get_fam_income_col(df, frames[i], var_name)
-
-    print(f'dataframe shape: {df.shape}')
+
+    df = collapse_column_families(df, ["fam_income"])
+
+    print_frame_report(df)
     
     return df
 
 # ---------------------------------- #
 
+# state post code -> us region bins
+# (New England shares the "east_south_atlantic" label, as it always has)
+US_REGIONS = {
+    "us_foreign": ['GU', 'VI', 'PR', 'MP', 'FM', 'MH', 'AS'],
+    "west_pacific": ['CA', 'AK', 'OR', 'WA', 'HI'],
+    "west_mountain": ['MT', 'AZ', 'CO', 'ID', 'NV', 'NM', 'UT'],
+    "midwest_north_central": ['ND', 'SD', 'MN', 'NE', 'IA', 'KS', 'MO', 'WY'],
+    "midwest_south_central": ['OK', 'AR', 'TX', 'LA'],
+    "east_north_central": ['MI', 'WI', 'IL', 'IN', 'OH'],
+    "east_south_central": ['KY', 'TN', 'MS', 'AL'],
+    "east_north_atlantic": ['NY', 'PA', 'NJ'],
+    "east_south_atlantic": ['WV', 'MD', 'DE', 'VA', 'DC', 'NC', 'SC', 'GA', 'FL', 'CT', 'MA', 'ME', 'NH', 'RI', 'VT']
+}
+
+# flat code table and fixed vocabulary built once at import
+STATE_REGION_LOOKUP = {state: region for region, states in US_REGIONS.items() for state in states}
+
+US_REGION_VOCAB = list(US_REGIONS)
+
+
 # Creating region categories from `state_post_code`
 def label_states(row):
-    '''Function that creates state bin / us region category''' 
+    '''Function that creates state bin / us region category
 
-    if row['state_post_code'] in ['GU', 'VI', 'PR',	'MP', 'FM',	'MH', 'AS']:
+    Row-wise version of `label_us_regions`, kept for `df.apply(axis = 1)` use.''' 
 
-        return "us_foreign"
+    return STATE_REGION_LOOKUP.get(row['state_post_code'], np.nan)
 
-    elif row['state_post_code'] in ['CA', 'AK', 'OR', 'WA', 'HI']:
 
-        return "west_pacific"
+def label_us_regions(state_post_codes):
+    '''Function that bins a whole `state_post_code` column into us regions 
+    at once, returning a pandas Categorical over `US_REGION_VOCAB`.
 
-    elif row['state_post_code'] in ['MT', 'AZ', 'CO', 'ID', 'NV', 'NM', 'UT']:
+    Unknown or missing state codes come back as NaN.'''
 
-        return "west_mountain"
-    
-    elif row['state_post_code'] in ['ND', 'SD', 'MN', 'NE', 'IA', 'KS', 'MO', 'WY']:
+    states = pd.Categorical(state_post_codes)
 
-        return "midwest_north_central"
+    # vocab position of every distinct state (-1 = NaN); the trailing slot catches nulls
+    region_codes = np.array(
+        [US_REGION_VOCAB.index(STATE_REGION_LOOKUP[state]) if state in STATE_REGION_LOOKUP else -1 for state in states.categories]
+        + [-1],
+        dtype = np.int8)
 
-    elif row['state_post_code'] in ['OK', 'AR', 'TX', 'LA']:
+    return pd.Categorical.from_codes(region_codes[states.codes], categories = US_REGION_VOCAB)
 
-        return "midwest_south_central"
 
-    elif row['state_post_code'] in ['MI', 'WI', 'IL', 'IN', 'OH']:
+# ---------------------------------------------------------------- #
+                    ### Dtype Compaction ###
+# ---------------------------------------------------------------- #
 
-        return "east_north_central"
+# shared vocabularies, so category codes line up across splits and refreshes
+CATEGORY_VOCABS = {
+    'major_category': MAJOR_CATEGORY_VOCAB,
+    'us_region': US_REGION_VOCAB,
+    'state_post_code': sorted(STATE_REGION_LOOKUP),
+    'institution_control': ['Public', 'Private, nonprofit', 'Private, for-profit']}
 
-    elif row['state_post_code'] in ['KY', 'TN', 'MS',	'AL']:
+# text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_SHARE = 0.5
 
-        return "east_south_central"
 
-    elif row['state_post_code'] in ['NY', 'PA', 'NJ']:
+def get_memory_mb(df):
 
-        return "east_north_atlantic"
+    '''Function that returns the deep memory usage of a df in MB.'''
 
-    elif row['state_post_code'] in ['WV', 'MD', 'DE', 'VA', 'DC', 'NC', 'SC', 'GA', 'FL']:
+    return df.memory_usage(deep = True).sum() / 1024 ** 2
 
-        return "east_south_atlantic"
-   
-    elif row['state_post_code'] in ['CT', 'MA', 'ME', 'NH', 'ME', 'RI', 'VT']:
 
-        return "east_south_atlantic"
+def print_frame_report(df, label = 'dataframe'):
 
-    else:
+    '''Function that prints a df's shape and memory usage.'''
+
+    print(f'{label} shape: {df.shape}, memory: {get_memory_mb(df):.2f} MB')
+
+
+def is_float32_lossless(values):
+
+    '''Function that checks whether float values survive a float32 round trip 
+    unchanged (NaNs included).'''
+
+    values = values.to_numpy(dtype = np.float64, na_value = np.nan)
+
+    with np.errstate(over = 'ignore'):
+        return np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan = True)
+
+
+def downcast_numeric(df, lossy_floats = False):
+
+    '''Function that downcasts integer columns (incl. nullable Int) to the 
+    smallest integer dtype that holds them, and float columns to float32 
+    only where every value round-trips exactly. With `lossy_floats`, every 
+    float column in float32 range goes to float32 (values such as 0.1 or 
+    123456.789 then lose precision).'''
+
+    int_cols = df.select_dtypes(include = "integer").columns
+    float_cols = [
+        col for col in df.select_dtypes(include = "floating").columns
+        if lossy_floats or is_float32_lossless(df[col])]
+
+    return df.assign(
+        **{col: pd.to_numeric(df[col], downcast = "integer") for col in int_cols}, 
+        **{col: pd.to_numeric(df[col], downcast = "float") for col in float_cols})
+
+
+def categorize_strings(df, vocabs = CATEGORY_VOCABS, max_unique_share = CATEGORY_MAX_UNIQUE_SHARE):
+
+    '''Function that converts low-cardinality text columns to Categorical. 
+    Columns with a shared vocabulary use it (unseen values are appended after 
+    the vocabulary rather than dropped).'''
+
+    text_cols = df.select_dtypes(include = ["object", "string", "category"]).columns
+
+    converted = {}
+
+    for col in text_cols:
+
+        values = df[col]
+
+        if col in vocabs:
+            vocab = list(vocabs[col])
+            seen = set(vocab)
+            extra = sorted({value for value in values.dropna().unique() if value not in seen}, key = str)
+            converted[col] = pd.Categorical(values, categories = vocab + extra)
+
+        elif values.dtype == "category":
+            continue
+
+        elif values.nunique() <= max_unique_share * len(values):
+            converted[col] = values.astype("category")
+
+    return df.assign(**converted)
+
+
+def compact_dtypes(df, verbose = True):
+
+    '''Function that shrinks a df's memory: numerics are downcast and 
+    low-cardinality text becomes Categorical, reporting memory before and 
+    after each step.'''
+
+    if verbose:
+        print_frame_report(df, 'input')
+
+    for step in [downcast_numeric, categorize_strings]:
+
+        df = step(df)
+
+        if verbose:
+            print_frame_report(df, step.__name__)
+
+    return df
 
-        return np.NaN
 
 # ---------------------------------------------------------------- #
                     ### Train, Validate, Test Split ###
 # ---------------------------------------------------------------- #
 
-def split_data(df):
-    train_and_validate, test = train_test_split(
-        df, 
-        test_size = 0.2, 
-        random_state = 123,
-        stratify = df["major_category"])
-
-    train, validate = train_test_split(
-        train_and_validate,
-        test_size = 0.3,
-        random_state = 123,
-        stratify = train_and_validate["major_category"])
+# split shares: 20% test, then 30% of the rest validate (as `train_test_split` did)
+SPLIT_SHARES = {'train': 0.56, 'validate': 0.24, 'test': 0.20}
+
+# rows sharing these values always land in the same split (no institution leakage), 
+# whatever their major
+SPLIT_GROUP_COLS = ['unit_id_institution']
+
+# changing the salt reshuffles every split
+SPLIT_SALT = 'roi_split_v1'
+
+# hash buckets per split decision
+SPLIT_BUCKETS = 10_000
+
+# None keeps the append-stable hash split; 'major_category' deals institutions 
+# to splits by quota within their dominant major (see `assign_split`)
+SPLIT_STRATIFY_COL = None
+
+
+def get_group_hashes(df, group_cols = SPLIT_GROUP_COLS, salt = SPLIT_SALT):
+
+    '''Function that hashes each row's group key to a stable uint64. 
+    Whole-number keys hash the same whether stored as int, nullable Int or 
+    float, so dtype changes don't move rows between splits.'''
+
+    keys = pd.Series(salt, index = df.index)
+
+    for col in group_cols:
+
+        values = df[col]
+
+        if pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values).round().astype("Int64")
+
+        keys = keys + '|' + values.astype(str)
+
+    return pd.util.hash_pandas_object(keys, index = False).to_numpy()
+
+
+def get_split_buckets(df, group_cols = SPLIT_GROUP_COLS, salt = SPLIT_SALT, buckets = SPLIT_BUCKETS):
+
+    '''Function that hashes each row's group key into a stable bucket in [0, buckets).'''
+
+    return (get_group_hashes(df, group_cols, salt) % np.uint64(buckets)).astype(np.int64)
+
+
+def get_split_quotas(n_groups, shares = SPLIT_SHARES):
+
+    '''Function that splits `n_groups` groups into per-split counts by 
+    largest remainder. With at least one group per split, every split gets 
+    one (taken from the largest).'''
+
+    exact = n_groups * np.asarray(list(shares.values()), dtype = np.float64)
+
+    counts = np.floor(exact).astype(np.int64)
+    counts[np.argsort(counts - exact)[:n_groups - counts.sum()]] += 1
+
+    if n_groups >= len(counts):
+        for i in np.flatnonzero(counts == 0):
+            counts[np.argmax(counts)] -= 1
+            counts[i] += 1
+
+    return counts
+
+
+def assign_split(df, group_cols = SPLIT_GROUP_COLS, shares = SPLIT_SHARES, salt = SPLIT_SALT, 
+                 buckets = SPLIT_BUCKETS, stratify_col = SPLIT_STRATIFY_COL):
+
+    '''Function that labels every row train/validate/test, keeping all rows of 
+    a group (institution) in one split.
+
+    By default each group's hash bucket alone decides its split: existing 
+    rows never move when new rows arrive, so it can be applied chunk by 
+    chunk during ingest, and majors get the `shares` in expectation.
+
+    With a `stratify_col`, each group is stratified by its dominant value 
+    (most rows; strata with fewer groups than splits are pooled into 
+    "other"). Within a stratum groups are ordered by their salted hash and 
+    dealt to the splits by per-split quotas (`get_split_quotas`), so every 
+    stratum is covered, but new groups can shift the quota boundaries.'''
+
+    names = list(shares)
+
+    hashes = get_group_hashes(df, group_cols, salt)
+
+    if stratify_col is None:
+
+        edges = np.cumsum([share * buckets for share in shares.values()])
+
+        codes = np.searchsorted(edges, (hashes % np.uint64(buckets)).astype(np.int64), side = 'right')
+
+        return pd.Series(pd.Categorical.from_codes(np.minimum(codes, len(names) - 1), categories = names), index = df.index, name = "split")
+
+    rows = pd.DataFrame({'group': hashes, 'stratum': df[stratify_col].astype(str).to_numpy()})
+
+    # dominant stratum per group (ties broken by stratum name)
+    groups = (rows.value_counts().rename('rows').reset_index()
+        .sort_values(['group', 'rows', 'stratum'], ascending = [True, False, True])
+        .drop_duplicates('group'))
+
+    # strata with fewer groups than splits are pooled
+    sizes = groups['stratum'].map(groups['stratum'].value_counts())
+    groups.loc[sizes < len(names), 'stratum'] = 'other'
+
+    groups = groups.sort_values(['stratum', 'group'])
+
+    groups['rank'] = groups.groupby('stratum').cumcount()
+    groups['n_groups'] = groups.groupby('stratum')['group'].transform('size')
+
+    groups['code'] = 0
+    for n_groups, rank in groups.groupby('n_groups')['rank']:
+        groups.loc[rank.index, 'code'] = np.searchsorted(np.cumsum(get_split_quotas(n_groups, shares)), rank, side = 'right')
+
+    codes = rows['group'].map(groups.set_index('group')['code']).to_numpy()
+
+    return pd.Series(pd.Categorical.from_codes(codes, categories = names), index = df.index, name = "split")
+
+
+def get_split_coverage(df, split, stratify_col = "major_category"):
+
+    '''Function that returns each stratum's share of rows per split 
+    (strata x splits, rows sum to 1).'''
+
+    return pd.crosstab(df[stratify_col].astype(str), split, normalize = 'index')
+
+
+def split_data(df, method = "hash", stratify_col = SPLIT_STRATIFY_COL):
+
+    '''Function that splits the df into train, validate and test.
+
+    `method = "hash"` (default) uses the institution-grouped split from 
+    `assign_split` (optionally stratified on `stratify_col`) and warns about 
+    majors missing from a split; `method = "random"` reproduces the previous 
+    `train_test_split` shuffle stratified on `major_category`.'''
+
+    if method == "hash":
+
+        split = assign_split(df, stratify_col = stratify_col)
+
+        coverage = get_split_coverage(df, split, "major_category")
+
+        print(f'max per-major share deviation: {(coverage - pd.Series(SPLIT_SHARES)).abs().max().round(3).to_dict()}')
+
+        missing = coverage.index[(coverage == 0).any(axis = 1)]
+        if len(missing):
+            warnings.warn(f"majors missing from a split (too few institutions): {missing.tolist()}")
+
+        train, validate, test = [df[split == name] for name in ["train", "validate", "test"]]
+
+    else:
+
+        train_and_validate, test = train_test_split(
+            df, 
+            test_size = 0.2, 
+            random_state = 123,
+            stratify = df["major_category"])
+
+        train, validate = train_test_split(
+            train_and_validate,
+            test_size = 0.3,
+            random_state = 123,
+            stratify = train_and_validate["major_category"])
     
-    print(f'train shape: {train.shape}')
-    print(f'validate shape: {validate.shape}')
-    print(f'test shape: {test.shape}')
+    print_frame_report(train, 'train')
+    print_frame_report(validate, 'validate')
+    print_frame_report(test, 'test')
 
     return train, validate, test
 
@@ -696,91 +977,475 @@ def split_data(df):
                 ### Outlier Capping & Imputation ###
 # ---------------------------------------------------------------- #
 
+# dont include target variables to cap
+CAPPING_EXCLUDED = [ 
+    "roi_5yr",
+    "roi_10yr",
+    "roi_20yr",
+    "pct_roi_5yr",
+    "pct_roi_10yr",
+    "pct_roi_20yr",
+    "Grand Total",
+    "avg_net_price",
+    "med_debt_pell_students",
+    "median_debt_non_pell",
+    "median_debt_completed"]
+
+
+def fit_percentile_caps(train_df, low_end = 0.1, high_end = 0.1, exclude = CAPPING_EXCLUDED):
+
+    '''Function that learns lower and upper caps for every numeric column 
+    (minus `exclude` and the earnings year columns) from the training split, 
+    in one `nanquantile` over the 2-D numeric block. NaNs are ignored rather 
+    than sorted in as large values, and integer columns get whole-number caps 
+    so clipping keeps their dtype.
+
+    Returns a df indexed by column with `lower` and `upper` caps.'''
+
+    exclude = list(exclude) + get_earning_years(train_df)
+
+    col_lst = [col for col in train_df.select_dtypes(include = "number").columns if col not in exclude]
+
+    block = train_df[col_lst].to_numpy(dtype = np.float64, na_value = np.nan)
+
+    # columns with no train values have no caps to learn
+    empty = np.isnan(block).all(axis = 0)
+
+    if empty.any():
+        warnings.warn(f"not capping columns with no values in train: {[col for col, is_empty in zip(col_lst, empty) if is_empty]}")
+
+        col_lst = [col for col, is_empty in zip(col_lst, empty) if not is_empty]
+        block = block[:, ~empty]
+
+    caps = pd.DataFrame(
+        np.nanquantile(block, [low_end, 1 - high_end], axis = 0).T, 
+        index = col_lst, 
+        columns = ["lower", "upper"])
+
+    # integer columns (incl. nullable Int) keep whole-number caps inside the quantile range
+    int_cols = train_df[col_lst].select_dtypes(include = "integer").columns
+    caps.loc[int_cols, "lower"] = np.ceil(caps.loc[int_cols, "lower"])
+    caps.loc[int_cols, "upper"] = np.floor(caps.loc[int_cols, "upper"])
+
+    return caps
+
+
+def apply_percentile_caps(df, caps):
+
+    '''Function that clips any split to caps learned by `fit_percentile_caps`, 
+    column by column with the caps cast to each column's dtype, so compacted 
+    float32 / Int columns keep their dtype. NaNs pass through untouched.'''
+
+    missing = caps.index[caps[["lower", "upper"]].isna().any(axis = 1)]
+
+    if len(missing):
+        warnings.warn(f"skipping columns without caps: {missing.tolist()}")
+
+    for col, (lower, upper) in caps.drop(index = missing)[["lower", "upper"]].iterrows():
+
+        dtype = df[col].dtype.type
+
+        df[col] = df[col].clip(lower = dtype(lower), upper = dtype(upper))
+
+    return df
+
+
 # Handles outliers 
-def percentile_capping(df, low_end = 0.1, high_end = 0.1):
-
-    '''Function that uses scipy's winsorize method to cap
-    continuous variables at lower and higher end based on a passed 
-    percentile values.'''
-
-    l1 = df.select_dtypes(include = "number").columns.tolist()
-
-    # dont include target variables to cap
-    target_lst = [ 
-                "roi_5yr",
-                "roi_10yr",
-                "roi_20yr",
-                "pct_roi_5yr",
-                "pct_roi_10yr",
-                "pct_roi_20yr",
-                "2017",                                               
-                "2018",                                                   
-                "2019",
-                "Grand Total",
-                "avg_net_price",
-                "med_debt_pell_students",
-                "median_debt_non_pell",
-                "median_debt_completed"]
-
-    col_lst = [col for col in l1 if col not in target_lst]
-
-    for col in col_lst:
-
-        stats.mstats.winsorize(
-            a = df[col], 
-            limits = (low_end, high_end), 
-            inplace = True)
-    
+def percentile_capping(df, low_end = 0.1, high_end = 0.1, caps = None):
+
+    '''Function that caps continuous variables at lower and higher end 
+    based on passed percentile values.
+
+    Pass `caps` from `fit_percentile_caps(train)` to cap validate/test at the 
+    train values; without it the caps are learned from `df` itself.'''
+
+    if caps is None:
+        caps = fit_percentile_caps(df, low_end, high_end)
+
+    return apply_percentile_caps(df, caps)
+
+
+def cap_splits(train, validate, test, low_end = 0.1, high_end = 0.1):
+
+    '''Function that fits percentile caps on train once and applies the 
+    same caps to all three splits.'''
+
+    caps = fit_percentile_caps(train, low_end, high_end)
+
+    train, validate, test = [apply_percentile_caps(df, caps) for df in (train, validate, test)]
+
+    return train, validate, test
+
+# _____________________________________ #
+
+# dont learn from these variables
+IMPUTER_EXCLUDED = CAPPING_EXCLUDED + [
+    'admission_rate',
+    'ACT_score_mid',
+    'avg_sat_admitted']
+
+# fitted imputer + its column list, refit only when the train split changes
+IMPUTER_CACHE = "iterative_imputer.pkl"
+
+# bump when the imputer settings below change
+IMPUTER_VERSION = 1
+
+
+def get_imputer_columns(df, exclude = IMPUTER_EXCLUDED):
+
+    '''Function that returns the numeric columns the imputer learns from and 
+    fills (never the earnings year columns).'''
+
+    exclude = list(exclude) + get_earning_years(df)
+
+    return [col for col in df.select_dtypes(include = "number").columns if col not in exclude]
+
+
+def get_frame_fingerprint(df, columns, values = None):
+
+    '''Function that fingerprints the float values (and index) of `columns` 
+    in `df`, together with the column list itself. `values` can stand in for 
+    the column block, e.g. the imputed array before it is written back.'''
+
+    if values is None:
+        values = df[columns].to_numpy(dtype = np.float64, na_value = np.nan)
+
+    h = hashlib.sha1(repr((IMPUTER_VERSION, list(columns))).encode())
+
+    h.update(pd.util.hash_pandas_object(df.index).to_numpy().tobytes())
+    h.update(np.ascontiguousarray(values, dtype = np.float64).tobytes())
+
+    return h.hexdigest()[:16]
+
+
+def restore_imputed_dtypes(imputed, dtypes):
+
+    '''Function that casts an imputed float64 block (df) back to the columns' 
+    pre-imputation dtypes, so the float32 / nullable Int compaction survives 
+    imputation. Integer columns are rounded to whole numbers first; one whose 
+    imputed values no longer fit its dtype gets the smallest integer dtype 
+    that holds them.'''
+
+    restored = {}
+
+    for col, dtype in dtypes.items():
+
+        values = imputed[col]
+
+        if pd.api.types.is_integer_dtype(dtype):
+
+            values = values.round()
+            info = np.iinfo(dtype.numpy_dtype if isinstance(dtype, pd.api.extensions.ExtensionDtype) else dtype)
+
+            if values.between(info.min, info.max).all() or values.isna().all():
+                values = values.astype(dtype)
+            else:
+                values = pd.to_numeric(values.astype("Int64"), downcast = "integer")
+
+        else:
+            values = values.astype(dtype)
+
+        restored[col] = values
+
+    return pd.DataFrame(restored, index = imputed.index)
+
+
+def fit_iterative_imputer(train_df, cache_path = IMPUTER_CACHE, engine = "sklearn", stratify_col = "major_category", **engine_options):
+
+    '''Function that fits an iterative imputer on the training split once and 
+    pickles it with its column list and the train fingerprints (before and 
+    after imputation at the restored dtypes, since train is imputed in place).
+
+    `engine = "sklearn"` uses sklearn's IterativeImputer; `engine = "fast"` 
+    uses `fit_fast_imputer` with `engine_options` (e.g. sample_size, tol, 
+    n_jobs), sampling rows stratified on `stratify_col`.
+
+    If the pickled imputer was fitted on an identical train split with the 
+    same settings, it is loaded and the fit is skipped entirely. A fresh fit 
+    also returns the imputed train values (`train_imputed`), which 
+    `apply_iterative_imputer` reuses for train.'''
+
+    num_lst = get_imputer_columns(train_df)
+
+    train_values = train_df[num_lst].to_numpy(dtype = np.float64, na_value = np.nan)
+
+    fingerprint = get_frame_fingerprint(train_df, num_lst, train_values)
+
+    settings = (engine, sorted(engine_options.items()))
+
+    if cache_path is not None and os.path.isfile(cache_path):
+
+        with open(cache_path, "rb") as f:
+            fitted = pickle.load(f)
+
+        if fingerprint in fitted.get("fingerprints", ()) and fitted.get("settings") == settings:
+            return fitted
+
+    if engine == "fast":
+
+        strata = train_df[stratify_col] if engine_options.get("sample_size") and stratify_col in train_df else None
+
+        imputer = fit_fast_imputer(train_values, strata = strata, **engine_options)
+
+        imputed = transform_fast_imputer(imputer, train_values)
+
+    else:
+
+        # creating the "thing"
+        imputer = IterativeImputer(
+                missing_values = np.nan, \
+                skip_complete = True, \
+                random_state = 123)
+
+        # fitting the "thing" and transforming it
+        imputed = imputer.fit_transform(train_values)
+
+    fitted = {
+        "engine": engine,
+        "settings": settings,
+        "imputer": imputer,
+        "columns": num_lst,
+        "fingerprints": (fingerprint, get_frame_fingerprint(train_df, num_lst, restore_imputed_dtypes(
+            pd.DataFrame(imputed, index = train_df.index, columns = num_lst), train_df[num_lst].dtypes).to_numpy(dtype = np.float64, na_value = np.nan)))}
+
+    if cache_path is not None:
+        with open(cache_path, "wb") as f:
+            pickle.dump(fitted, f, protocol = pickle.HIGHEST_PROTOCOL)
+
+    # the fit already imputed train: kept (unpickled) so train isn't imputed twice
+    return dict(fitted, train_imputed = imputed)
+
+
+def load_iterative_imputer(cache_path = IMPUTER_CACHE):
+
+    '''Function that loads a previously fitted imputer for scoring new batches.'''
+
+    with open(cache_path, "rb") as f:
+        return pickle.load(f)
+
+
+def apply_iterative_imputer(df, fitted, imputed = None):
+
+    '''Function that fills missing values in `df` with a fitted imputer, 
+    using the column list it was fitted on. `imputed` values already 
+    computed for `df` (the fit's `train_imputed`) are written as-is.'''
+
+    num_lst = fitted["columns"]
+
+    if imputed is None:
+
+        values = df[num_lst].to_numpy(dtype = np.float64, na_value = np.nan)
+
+        if fitted.get("engine") == "fast":
+            imputed = transform_fast_imputer(fitted["imputer"], values)
+        else:
+            imputed = fitted["imputer"].transform(values)
+
+    # filling in missing values from learned imputer, at the columns' own dtypes
+    imputed = restore_imputed_dtypes(pd.DataFrame(imputed, index = df.index, columns = num_lst), df[num_lst].dtypes)
+
+    for col in num_lst:
+        df[col] = imputed[col]
+
     return df
 
+
 # _____________________________________ #
+
+# faster imputation engine: round-robin regressions fitted in parallel 
+# (all columns against the same fill per round), optionally on a stratified 
+# row sample, stopping early once the imputed values settle
+
+def fit_column_estimator(filled, missing, col):
+
+    '''Function that fits one column's regression on the rows where it was 
+    observed, against the current fill of every other column.'''
+
+    rows = ~missing[:, col]
+
+    estimator = BayesianRidge()
+    estimator.fit(np.delete(filled[rows], col, axis = 1), filled[rows, col])
+
+    return estimator
+
+
+def run_imputation_round(filled, missing, estimators):
+
+    '''Function that re-predicts every missing entry from one round of 
+    column estimators and returns the new fill.'''
+
+    new_filled = filled.copy()
+
+    for col, estimator in estimators.items():
+
+        rows = missing[:, col]
+
+        if rows.any():
+            new_filled[rows, col] = estimator.predict(np.delete(filled[rows], col, axis = 1))
+
+    return new_filled
+
+
+def get_sample_strata(strata, sample_size):
+
+    '''Function that makes `strata` safe to stratify a sample of `sample_size` 
+    rows on: missing values count as "other", and the smallest strata are 
+    pooled into "other" until every stratum has at least 2 rows. Returns None 
+    (unstratified) when that leaves a single stratum or more strata than 
+    rows on either side of the sample.'''
+
+    if strata is None:
+        return None
+
+    strata = pd.Series(np.asarray(strata, dtype = object))
+    strata = strata.where(strata.notna(), 'other').astype(str).to_numpy()
+
+    counts = pd.Series(strata).value_counts()
+
+    while counts.min() < 2 and len(counts) > 1:
+        strata[np.isin(strata, counts.index[-2:])] = 'other'
+        counts = pd.Series(strata).value_counts()
+
+    if len(counts) < 2 or len(counts) > min(sample_size, len(strata) - sample_size):
+        return None
+
+    return strata
+
+
+def fit_fast_imputer(values, strata = None, sample_size = None, max_iter = 10, tol = 1e-3, 
+                     n_jobs = -1, random_state = 123, verbose = True):
+
+    '''Function that fits the faster imputation engine on a 2-D float array 
+    (NaN = missing) and returns its fitted state.
+
+    - each round fits a BayesianRidge per incomplete column, in parallel
+    - `sample_size` rows (stratified on `strata` when given) are used for fitting
+    - fitting stops once the largest change in imputed values falls below 
+      `tol` times the largest observed magnitude (as IterativeImputer does)
+    - the per-round change and time is kept in the state's `trace`'''
+
+    values = np.asarray(values, dtype = np.float64)
+
+    if sample_size is not None and sample_size < len(values):
+        sample_rows, _ = train_test_split(
+            np.arange(len(values)), 
+            train_size = sample_size, 
+            random_state = random_state, 
+            stratify = get_sample_strata(strata, sample_size))
+        values = values[np.sort(sample_rows)]
+
+    missing = np.isnan(values)
+
+    # initial fill: column means (0 for columns never observed)
+    means = np.nan_to_num(np.nanmean(np.where(missing.all(axis = 0), 0, values), axis = 0))
+
+    filled = np.where(missing, means, values)
+
+    impute_cols = np.flatnonzero(missing.any(axis = 0) & ~missing.all(axis = 0))
+
+    threshold = tol * np.max(np.abs(values[~missing]), initial = 0)
+
+    rounds = []
+    trace = []
+
+    for iteration in range(1, max_iter + 1):
+
+        start = time.perf_counter()
+
+        fits = Parallel(n_jobs = n_jobs, prefer = "threads")(
+            delayed(fit_column_estimator)(filled, missing, col) for col in impute_cols)
+
+        estimators = dict(zip(impute_cols, fits))
+
+        new_filled = run_imputation_round(filled, missing, estimators)
+
+        change = float(np.max(np.abs(new_filled - filled), initial = 0))
+
+        filled = new_filled
+        rounds.append(estimators)
+        trace.append({"iteration": iteration, "change": change, "seconds": time.perf_counter() - start})
+
+        if verbose:
+            print(f'imputation round {iteration}: change {change:.6g} ({trace[-1]["seconds"]:.2f}s)')
+
+        if change < threshold:
+            break
+
+    return {
+        "means": means,
+        "rounds": rounds,
+        "trace": trace}
+
+
+def transform_fast_imputer(state, values):
+
+    '''Function that fills NaNs in a 2-D float array by replaying the fitted 
+    rounds of `fit_fast_imputer`.'''
+
+    values = np.asarray(values, dtype = np.float64)
+
+    missing = np.isnan(values)
+
+    filled = np.where(missing, state["means"], values)
+
+    for estimators in state["rounds"]:
+        filled = run_imputation_round(filled, missing, estimators)
+
+    return filled
+
+
+def benchmark_imputers(df, columns = None, mask_frac = 0.05, random_state = 123, **fast_kwargs):
+
+    '''Function that hides a random `mask_frac` of the observed values in `df` 
+    and times how well each imputer recovers them: the fast engine, sklearn's 
+    IterativeImputer (as used in `train_iterative_imputer`) and the KNNImputer 
+    from the cluster notebooks.
+
+    Accuracy is the RMSE over the hidden values, with each column scaled by 
+    its standard deviation so columns are comparable.'''
+
+    if columns is None:
+        columns = get_imputer_columns(df)
+
+    values = df[columns].to_numpy(dtype = np.float64, na_value = np.nan)
+
+    rng = np.random.default_rng(random_state)
+
+    hidden = ~np.isnan(values) & (rng.random(values.shape) < mask_frac)
+
+    masked = np.where(hidden, np.nan, values)
+
+    scale = np.nanstd(values, axis = 0)
+    scale[~(scale > 0)] = 1
+
+    imputers = {
+        "fast": lambda X: transform_fast_imputer(fit_fast_imputer(X, verbose = False, **fast_kwargs), X),
+        "iterative": lambda X: IterativeImputer(missing_values = np.nan, skip_complete = True, random_state = 123).fit_transform(X),
+        "knn": lambda X: KNNImputer().fit_transform(X)}
+
+    results = []
+
+    for name, impute in imputers.items():
+
+        start = time.perf_counter()
+        imputed = impute(masked)
+        seconds = time.perf_counter() - start
+
+        errors = ((imputed - values) / scale)[hidden]
+
+        results.append({"imputer": name, "seconds": round(seconds, 3), "scaled_rmse": round(float(np.sqrt(np.mean(errors ** 2))), 4)})
+
+    return pd.DataFrame(results).set_index("imputer")
+
+
 #
 def train_iterative_imputer(train_df):
     '''using sklearn's iterative imputer to fill-in remaining nulls. Placeholder for continuous features.'''
 
-    l1 = train_df.select_dtypes(include = "number").columns.tolist()
-
-    # dont learn from these variables
-    target_lst = [ 
-        "roi_5yr",
-        "roi_10yr",
-        "roi_20yr",
-        "pct_roi_5yr",
-        "pct_roi_10yr",
-        "pct_roi_20yr",
-        "2017",                                               
-        "2018",                                                   
-        "2019",
-        "Grand Total",
-        "avg_net_price",
-        "med_debt_pell_students",
-        "median_debt_non_pell",
-        "median_debt_completed",
-        'admission_rate',
-        'ACT_score_mid',
-        'avg_sat_admitted'
-    ]
-    
-    num_lst = [col for col in l1 if col not in target_lst]
-    
-    # creating the "thing"
-    imputer = IterativeImputer(
-            missing_values = np.nan, \
-            skip_complete = True, \
-            random_state = 123)
-    
-    # fitting the "thing" and transforming it
-    imputed = imputer.fit_transform(train_df[num_lst])
-
-        # create a new dataframe with learned imputed data
-    train_df_imputed = pd.DataFrame(imputed, index = train_df.index)
-
-    # filling in missing values from learned imputer
-    train_df[num_lst] = train_df_imputed
+    fitted = fit_iterative_imputer(train_df)
 
     # return the new imputed df
-    return train_df
-
+    return apply_iterative_imputer(train_df, fitted, fitted.get("train_imputed"))
 
 
 # _____________________________________ #
@@ -788,94 +1453,184 @@ def train_iterative_imputer(train_df):
 def impute_val_and_test(train_df, val_df, test_df):
         
         '''Function takes in all three split datasets and imputes missing values in validate and test after
-        fitting on training dataset columns'''
-
-        l1 = train_df.select_dtypes(include = "number").columns.tolist()
-
-        target_lst = [ 
-        "roi_5yr",
-        "roi_10yr",
-        "roi_20yr",
-        "pct_roi_5yr",
-        "pct_roi_10yr",
-        "pct_roi_20yr",
-        "2017",                                               
-        "2018",                                                   
-        "2019",
-        "Grand Total",
-        "avg_net_price",
-        "med_debt_pell_students",
-        "median_debt_non_pell",
-        "median_debt_completed",
-        'admission_rate',
-        'ACT_score_mid',
-        'avg_sat_admitted'
-        ]
-
-        # recheck cols are not in target list
-        num_lst = [col for col in l1 if col not in target_lst]
-
-        # creating the sklearn imputer
-        imputer = IterativeImputer(
-                missing_values = np.nan, \
-                skip_complete = True, \
-                random_state = 123)
+        fitting on training dataset columns.
 
-        # fitting the imputer
-        imputed = imputer.fit(train_df[num_lst])
+        The fit is shared with `train_iterative_imputer`: the pickled imputer is reused 
+        instead of refit whether train is passed before or after imputation.'''
 
-        # transforming values
-        val_imputed = imputed.transform(val_df[num_lst])
-        X_validate_imputed = pd.DataFrame(val_imputed, index = val_df.index)
-        val_df[num_lst] = X_validate_imputed
-        validate_imputed = val_df
+        fitted = fit_iterative_imputer(train_df)
 
-        test_imputed = imputed.transform(test_df[num_lst])
-        test_imputed = pd.DataFrame(test_imputed, index = test_df.index)
-        test_df[num_lst] = test_imputed
-        test_imputed = test_df
+        validate_imputed = apply_iterative_imputer(val_df, fitted)
+        test_imputed = apply_iterative_imputer(test_df, fitted)
 
         # returning the imputed validate and test datasets
         return validate_imputed, test_imputed
 
 
+def impute_splits(train_df, val_df, test_df):
+
+    '''Function that fits (or reloads) the imputer once on train and fills 
+    all three splits with it.'''
+
+    fitted = fit_iterative_imputer(train_df)
+
+    train_df = apply_iterative_imputer(train_df, fitted, fitted.get("train_imputed"))
+    val_df, test_df = [apply_iterative_imputer(df, fitted) for df in (val_df, test_df)]
+
+    return train_df, val_df, test_df
+
+
 # ---------------------------------------------------------------- #
     ### Subsidiary Repository of Manual Imputation Functions ###
 # ---------------------------------------------------------------- #
 
-def fill_null_with_mean(df):
-    '''fill the null value with avg for each major'''
-    
-    df['admission_rate'] = df.groupby('major_category')['admission_rate'].apply(lambda x:x.fillna(x.mean()))
-    df['ACT_score_mid'] = df.groupby('major_category')['ACT_score_mid'].apply(lambda x:x.fillna(x.mean()))
-    df['avg_sat_admitted'] = df.groupby('major_category')['avg_sat_admitted'].apply(lambda x:x.fillna(x.mean()))
-    
-    return df
+# column -> (group-by column or None for the whole split, statistic, extra value treated as missing)
+GROUP_IMPUTE_SPEC = {
+    # by major average for entrance exams/admissions rate
+    'admission_rate': ('major_category', 'mean', None),
+    'ACT_score_mid': ('major_category', 'mean', None),
+    'avg_sat_admitted': ('major_category', 'mean', None),
+    # `avg_net_price` of 0 split by `institution_control` (Public, Private For-Profit, Private Non-Profit)
+    'avg_net_price': ('institution_control', 'median', 0),
+    # median debt
+    'med_debt_pell_students': (None, 'median', None),
+    'median_debt_non_pell': (None, 'median', None),
+    'median_debt_completed': (None, 'median', None)}
 
-def impute_avg_net_price(df):
-    # Impute `avg_net_price` where value = 0; perform split by `institution_control` var (Public, Private For-Profit, Private Non-Profit)
+# whole-number debt columns after filling
+GROUP_IMPUTE_DTYPES = {'med_debt_pell_students': 'int64', 'median_debt_non_pell': 'int64', 'median_debt_completed': 'int64'}
 
-    df.loc[(df.institution_control == 'Public') & (df.avg_net_price == 0), 'avg_net_price'] = 14502
-    df.loc[(df.institution_control == 'Private, nonprofit') & (df.avg_net_price == 0), 'avg_net_price'] = 22961
-    df.loc[(df.institution_control == 'Private, for-profit') & (df.avg_net_price == 0), 'avg_net_price'] = 18640
+GROUP_IMPUTER_CACHE = "group_imputer.pkl"
 
-    return df
 
-def impute_debt(df):
+def get_group_imputer_values(df, col, missing_value):
 
-    df['med_debt_pell_students'] = np.where(df['med_debt_pell_students'].isna(), 17500, df['med_debt_pell_students'])
-    df['median_debt_non_pell'] = np.where(df['median_debt_non_pell'].isna(), 14768, df['median_debt_non_pell'])
-    df['median_debt_completed'] = np.where(df['median_debt_completed'].isna(), 23250, df['median_debt_completed'])
+    '''Function that returns `col` as floats with its missing marker (if any) set to NaN.'''
 
-    df = df.astype({'med_debt_pell_students': 'int64', 'median_debt_non_pell': 'int64', 'median_debt_completed': 'int64'})
-    
-    return df
+    values = df[col].astype(np.float64)
 
+    if missing_value is not None:
+        values = values.mask(values == missing_value)
 
-def manual_imputer(df):
-    # calls all manual imputation functions for important vars
-    df = fill_null_with_mean(df)
-    df = impute_avg_net_price(df)
-    df = impute_debt(df)
+    return values
 
-    return df
+
+def fit_group_imputer(train_df, spec = GROUP_IMPUTE_SPEC, cache_path = None):
+
+    '''Function that learns every fill value in `spec` from the training split: 
+    one groupby pass per group-by column computes the mean and median of all 
+    of its columns at once, plus the whole-split statistic as a fallback for 
+    unseen or empty groups.
+
+    Returns (and optionally pickles to `cache_path`) the fitted statistics.'''
+
+    spec = {col: rule for col, rule in spec.items() if col in train_df}
+
+    values = pd.DataFrame(
+        {col: get_group_imputer_values(train_df, col, missing_value) for col, (_, _, missing_value) in spec.items()}, 
+        index = train_df.index)
+
+    fallback = values.agg(['mean', 'median'])
+
+    stats_by_group = {}
+
+    for group_col in {group_col for group_col, _, _ in spec.values() if group_col is not None}:
+
+        cols = [col for col, (by, _, _) in spec.items() if by == group_col]
+
+        stats_by_group[group_col] = values[cols].groupby(train_df[group_col], observed = True).agg(['mean', 'median'])
+
+    fitted = {"spec": spec, "fills": {}}
+
+    for col, (group_col, statistic, missing_value) in spec.items():
+
+        fitted["fills"][col] = {
+            "group_col": group_col,
+            "missing_value": missing_value,
+            "by_group": None if group_col is None else stats_by_group[group_col][(col, statistic)].to_dict(),
+            "overall": fallback.loc[statistic, col]}
+
+    if cache_path is not None:
+        with open(cache_path, "wb") as f:
+            pickle.dump(fitted, f, protocol = pickle.HIGHEST_PROTOCOL)
+
+    return fitted
+
+
+def load_group_imputer(cache_path = GROUP_IMPUTER_CACHE):
+
+    '''Function that loads pickled group statistics from `fit_group_imputer`.'''
+
+    with open(cache_path, "rb") as f:
+        return pickle.load(f)
+
+
+def apply_group_imputer(df, fitted, columns = None):
+
+    '''Function that fills any split from fitted group statistics (all fitted 
+    columns, or just `columns`): each column's group values are mapped onto 
+    the rows in one vectorized step.'''
+
+    for col, fill in fitted["fills"].items():
+
+        if col not in df or (columns is not None and col not in columns):
+            continue
+
+        missing = get_group_imputer_values(df, col, fill["missing_value"]).isna()
+
+        if not missing.any():
+            continue
+
+        if fill["group_col"] is None:
+            values = fill["overall"]
+        else:
+            values = df.loc[missing, fill["group_col"]].map(fill["by_group"]).astype(np.float64).fillna(fill["overall"])
+
+        df[col] = df[col].astype(np.float64).mask(missing, values)
+
+    dtypes = {col: dtype for col, dtype in GROUP_IMPUTE_DTYPES.items() 
+              if col in df and col in fitted["fills"] and (columns is None or col in columns) and df[col].notna().all()}
+
+    return df.astype(dtypes)
+
+
+def impute_group_columns(df, columns, fitted = None):
+
+    '''Function that fills only `columns` from fitted group statistics 
+    (learned from `df` itself when `fitted` is not given).'''
+
+    if fitted is None:
+        fitted = fit_group_imputer(df, {col: GROUP_IMPUTE_SPEC[col] for col in columns})
+
+    return apply_group_imputer(df, fitted, columns)
+
+
+def impute_avg_net_price(df, fitted = None):
+    # Impute `avg_net_price` where value = 0; by `institution_control` median (Public, Private For-Profit, Private Non-Profit)
+    return impute_group_columns(df, ['avg_net_price'], fitted)
+
+
+def impute_debt(df, fitted = None):
+    # Impute missing median debt with the median
+    return impute_group_columns(df, ['med_debt_pell_students', 'median_debt_non_pell', 'median_debt_completed'], fitted)
+
+
+def manual_imputer(df, fitted = None):
+    # fills important vars from group statistics learned on train (see `fit_group_imputer`);
+    # without `fitted` the statistics are learned from `df` itself
+    if fitted is None:
+        fitted = fit_group_imputer(df)
+
+    return apply_group_imputer(df, fitted)
+
+
+def impute_group_splits(train, validate, test, cache_path = GROUP_IMPUTER_CACHE):
+
+    '''Function that learns the group statistics on train once and fills 
+    all three splits with them.'''
+
+    fitted = fit_group_imputer(train, cache_path = cache_path)
+
+    train, validate, test = [apply_group_imputer(df, fitted) for df in (train, validate, test)]
+
+    return train, validate, test
@@ -0,0 +1,344 @@
+# notebook dependencies
+import os
+import pickle
+from functools import lru_cache
+
+
+# ------------------------------------------------------------------------------------------ #
+        # Schema registry for the Dept. of Education - College Scorecard Dataset
+# ------------------------------------------------------------------------------------------ #
+
+# the Scorecard data dictionary shipped with the raw download
+SCORECARD_YAML = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "mm_folder",
+    "historical_documents",
+    "CollegeScorecard_Raw_Data_09012022",
+    "data.yaml")
+
+# compiled (pickled) form of the data dictionary, rebuilt when the yaml changes
+SCHEMA_CACHE = os.path.join(os.path.dirname(SCORECARD_YAML), "data_schema.pkl")
+
+# bump when the compiled layout below changes
+SCHEMA_VERSION = 2
+
+# NSLDS-derived families (debt, earnings, repayment, default) are the fields
+# published with `PrivacySuppressed` in place of small-cell values
+SUPPRESSIBLE_MARKERS = ("DEBT", "EARN", "RPY", "CDR", "BBRR", "DBRR")
+
+
+# friendly names used throughout prepare/explore/model
+# -------------------------------------------- #
+
+FRIENDLY_NAMES = {
+    "UNITID": "unit_id_institution",
+    "INSTNM_x": "college_name",
+    "CONTROL_x": "institution_control",
+    "STABBR": "state_post_code",
+    "ZIP": "zip_code",
+    "CITY": "city",
+    "REGION": "region_ipeds",
+    "OPEFLAG": "title_IV_eligibility",
+    "PREDDEG": "pred_degree",
+    "SCH_DEG": "pred_degree_0and4",
+    "CREDDESC": "degree_name",
+    "CREDLEV": "degree_code",
+    "CIPCODE": "major_code",
+    "CIPDESC": "major_name",
+    "NUMBRANCH": "branch_number",
+    "NPT4_PUB": "avg_net_price_public",
+    "NPT4_PRIV": "avg_net_price_private",
+    "NPT4_PROG": "avg_net_price_program",
+    "NPT4_OTHER": "avg_net_price_other",
+    'NUM41_PUB':'pub_fam_income_0_30000',
+    'NUM41_PRIV':'private_fam_income_0_30000',
+    'NUM41_PROG':'program_fam_income_0_30000',
+    'NUM41_OTHER':'other_fam_income_0_30000',
+    'NUM42_PUB':'pub_fam_income_30001_48000',
+    'NUM42_PRIV':'private_fam_income_30001_48000',
+    'NUM42_PROG':'program_fam_income_30001_48000',
+    'NUM42_OTHER':'other_fam_income_30001_48000',
+    'NUM43_PUB':'pub_fam_income_48001_75000',
+    'NUM43_PRIV':'private_fam_income_48001_75000',
+    'NUM43_PROG':'program_fam_income_48001_75000',
+    'NUM43_OTHER':'other_fam_income_48001_75000',
+    'NUM44_PUB':'pub_fam_income_75001_110000',
+    'NUM44_PRIV':'private_fam_income_75001_110000',
+    'NUM44_PROG':'program_fam_income_75001_110000',
+    'NUM44_OTHER':'other_fam_income_75001_110000',
+    'NUM45_PUB':'pub_fam_income_over_110000',
+    'NUM45_PRIV':'private_fam_income_over_110000',
+    'NUM45_PROG':'program_fam_income_over_110000',
+    'NUM45_OTHER':'other_fam_income_over_110000',
+    "NUM4_PRIV": "title_IV_student_number",
+    "TUITFTE": "full_time_net_tuition_revenue",
+    "ROOMBOARD_OFF": "off_campus_cost_of_attendace",
+    "ROOMBOARD_ON": "on_campus_cost_of_attendace",
+    "ADM_RATE": "admission_rate",
+    "GRADS": "graduate_number",
+    "ACTCMMID": "ACT_score_mid",
+    "SAT_AVG": "avg_sat_admitted",
+    "ADMCON7": "required_score",
+    "AVGFACSAL": "avg_faculty_salary",
+    "DISTANCEONLY": "online_only",
+    "C150_4": "comp_rt_ft_150over_expected_time",
+    "C150_4_2MOR": "comp_rt_ft_150over_expected_time_two_races",
+    "C150_4_AIAN": "comp_rt_ft_150over_expected_time_native_american",
+    "C150_4_ASIAN": "comp_rt_ft_150over_expected_time_asian",
+    "C150_4_BLACK": "comp_rt_ft_150over_expected_time_black",
+    "C150_4_HISP": "comp_rt_ft_150over_expected_time_hispanic",
+    "C150_4_NRA": "comp_rt_ft_150over_expected_time_non_resident",
+    "C150_4_UNKN": "comp_rt_ft_150over_expected_time_unknown_race",
+    "C150_4_WHITE": "comp_rt_ft_150over_expected_time_white",
+    "PFTFTUG1_EF": "share_entering_students_first_ft",
+    "PPTUG_EF": "share_of_part_time",
+    "RET_FT4": "first_time_ft_student_retention",
+    "RET_PT4": "first_time_pt_student_retention",
+    "UGDS_2MOR": "enrollment_share_two_races",
+    "UGDS_AIAN": "enrollment_share_native_american",
+    "UGDS_ASIAN": "enrollment_share_asian",
+    "UGDS_BLACK": "enrollment_share_black",
+    "UGDS_HISP": "enrollment_share_hispanic",
+    "UGDS_NHPI": "enrollment_share_pac_islander",
+    "UGDS_NRA": "enrollment_share_non_resident",
+    "UGDS_UNKN": "enrollment_share_unknown",
+    "UGDS_WHITE": "enrollment_share_white",
+    "D_PCTPELL_PCTFLOAN": "undergraduate_number_pell_grant_fedral_loan",
+    "DEBT_MDN": "median_loan_repayment",
+    "PELL_DEBT_MDN": "med_debt_pell_students",
+    "LO_INC_DEBT_MDN": "median_debt_0_30000",
+    "MD_INC_DEBT_MDN": "median_debt_30001_75000",
+    "HI_INC_DEBT_MDN": "median_debt_75001+",
+    "GRAD_DEBT_MDN": "median_debt_completed",
+    "WDRAW_DEBT_MDN": "not_completed_med_debt",
+    "MALE_DEBT_MDN": "median_debt_male",
+    "FEMALE_DEBT_MDN": "median_debt_female",
+    "IND_DEBT_MDN": "median_debt_independent",
+    "FIRSTGEN_DEBT_MDN": "median_debt_first_generation",
+    "NOTFIRSTGEN_DEBT_MDN": "median_debt_non_first_generation",
+    "NOPELL_DEBT_MDN": "median_debt_non_pell",
+    "FTFTPCTFLOAN": "fedral_loan_full_time_first_time_undergraduate",
+    "FTFTPCTPELL": "pell_grant_full_time_first_time_undergraduate",
+    "DEBT_PELL_PP_EVAL_MDN": "med_parent_and_pell",
+    "DEBT_PELL_PP_EVAL_MEAN": "avg_parent_and_pell",
+    "DEBT_PELL_STGP_EVAL_MDN": "med_stafford_and_pell",
+    "DEBT_PELL_STGP_EVAL_MEAN": "avg_stafford_and_pell",
+    "DEBT_ALL_PP_EVAL_MDN": "med_parent_and_loan",
+    "DEBT_ALL_PP_EVAL_MEAN": "avg_parent_and_loan",
+    "DEBT_ALL_STGP_EVAL_MDN": "med_stafford_and_debt",
+    "DEBT_ALL_STGP_EVAL_MEAN": "avg_stafford_and_debt",
+    "DEBT_ALL_STGP_EVAL_MDN10YRPAY": "med_stafford_and_grad_debt",
+    "DEBT_NOPELL_STGP_EVAL_MDN": "med_stafford_and_no_pell_recipients",
+    "DEBT_NOPELL_STGP_EVAL_MEAN": "avg_stafford_and_no_pell_recipients",
+    "DEBT_ALL_PP_EVAL_MDN10YRPAY": "med_monthly_payment_parent_and_debt",
+    "PCIP01": "deg_percent_awarded_agriculture_operations",
+    "PCIP03": "deg_percent_awarded_natural_resources",
+    "PCIP04": "deg_percent_awarded_architecture",
+    "PCIP05": "deg_percent_awarded_area_ethnic_cultural_gender",
+    "PCIP09": "deg_percent_awarded_communication_journalism",
+    "PCIP10": "deg_percent_awarded_communication_tech",
+    "PCIP11": "deg_percent_awarded_computer_science",
+    "PCIP12": "deg_percent_awarded_personal_culinary_services",
+    "PCIP13": "deg_percent_awarded_education",
+    "PCIP14": "deg_percent_awarded_engineering",
+    "PCIP15": "deg_percent_awarded_engineering_tech",
+    "PCIP16": "deg_percent_awarded_foreign_language_literatures",
+    "PCIP19": "deg_percent_awarded_human_science",
+    "PCIP22": "deg_percent_awarded_legal_profession",
+    "PCIP23": "deg_percent_awarded_english_lang",
+    "PCIP24": "deg_percent_awarded_general_studies",
+    "PCIP25": "deg_percent_awarded_library_sciences",
+    "PCIP26": "deg_percent_awarded_bio_sciences",
+    "PCIP27": "deg_percent_awarded_mathematics",
+    "PCIP29": "deg_percent_awarded_military_tech",
+    "PCIP30": "deg_percent_awarded_intedisciplinary_studies",
+    "PCIP31": "deg_percent_awarded_leisure_fitness",
+    "PCIP38": "deg_percent_awarded_philosophy",
+    "PCIP39": "deg_percent_awarded_theology",
+    "PCIP40": "deg_percent_awarded_physical_sciences",
+    "PCIP41": "deg_percent_awarded_science_tech",
+    "PCIP42": "deg_percent_awarded_psychology",
+    "PCIP43": "deg_percent_awarded_homeland_security",
+    "PCIP44": "deg_percent_awarded_public_admin",
+    "PCIP45": "deg_percent_awarded_social_sciences",
+    "PCIP46": "deg_percent_awarded_construction_trades",
+    "PCIP47": "deg_percent_awarded_mechanic_repair",
+    "PCIP48": "deg_percent_awarded_precision_production",
+    "PCIP49": "deg_percent_awarded_transportation_materials",
+    "PCIP50": "deg_percent_awarded_visual_and_performing_arts",
+    "PCIP51": "deg_percent_awarded_health",
+    "PCIP52": "deg_percent_awarded_business_management",
+    "PCIP54": "deg_percent_awarded_history",
+    "UGNONDS": "non_deg_seeking"
+}
+
+
+# compiling the data dictionary
+# -------------------------------------------- #
+
+def pandas_dtype(field_type, index):
+
+    '''Function that maps a data dictionary type/index pair to the
+    compact pandas dtype used when parsing that column.
+
+    Index widths mark code columns (tinyint -> Int8, integer -> Int32);
+    un-indexed integers are measures that carry nulls, so they are read as floats.'''
+
+    if index == "tinyint":
+        return "Int8"
+
+    elif field_type in ("integer", "long") and index == "integer":
+        return "Int32"
+
+    elif field_type == "integer" or field_type == "float":
+        return "float32"
+
+    elif field_type == "long":
+        return "float64"
+
+    elif field_type == "boolean":
+        return "boolean"
+
+    # short varchar fields are near-unique identifiers (zip codes, OPE ids)
+    elif index is not None and index.startswith("varchar(") and int(index[8:-1]) <= 20:
+        return "str"
+
+    else:
+        return "category"
+
+
+def compile_schema(yaml_path = SCORECARD_YAML, cache_path = SCHEMA_CACHE):
+
+    '''Function that parses the Scorecard data.yaml once and pickles a compact
+    registry of every sourced column: its table, api name, type, index,
+    pandas dtype and whether it can be privacy-suppressed, plus the
+    file-wide null markers.
+
+    Program-level (field of study) fields are keyed by their CSV column name,
+    i.e. without the data dictionary's `P_` prefix.'''
+
+    import yaml
+
+    # the libyaml-backed loader is an order of magnitude faster when available
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    with open(yaml_path) as f:
+        raw = yaml.load(f, Loader = loader)
+
+    columns = {"institution": {}, "program": {}}
+
+    for api_name, field in raw["dictionary"].items():
+
+        source = field.get("source")
+
+        # calculated fields have no column of their own
+        if source is None:
+            continue
+
+        if field.get("map") == "program":
+            table = "program"
+            source = source[2:] if source.startswith("P_") else source
+        else:
+            table = "institution"
+
+        # first definition of a source column wins
+        columns[table].setdefault(source, {
+            "name": api_name,
+            "type": field.get("type"),
+            "index": field.get("index"),
+            "dtype": pandas_dtype(field.get("type"), field.get("index")),
+            "suppressible": any(marker in source for marker in SUPPRESSIBLE_MARKERS)
+        })
+
+    stat = os.stat(yaml_path)
+
+    registry = {
+        "version": SCHEMA_VERSION,
+        "stamp": (stat.st_size, stat.st_mtime_ns),
+        "null_values": [str(value) for value in raw.get("null_value", [])],
+        "columns": columns
+    }
+
+    with open(cache_path, "wb") as f:
+        pickle.dump(registry, f, protocol = pickle.HIGHEST_PROTOCOL)
+
+    return registry
+
+
+@lru_cache(maxsize = None)
+def load_schema(yaml_path = SCORECARD_YAML, cache_path = SCHEMA_CACHE):
+
+    '''Function that returns the compiled schema registry, re-compiling the
+    yaml only when the pickled copy is missing or out of date.'''
+
+    stat = os.stat(yaml_path)
+
+    if os.path.isfile(cache_path):
+
+        with open(cache_path, "rb") as f:
+            registry = pickle.load(f)
+
+        if registry.get("version") == SCHEMA_VERSION and registry.get("stamp") == (stat.st_size, stat.st_mtime_ns):
+            return registry
+
+    return compile_schema(yaml_path, cache_path)
+
+
+# registry lookups used by the loaders
+# -------------------------------------------- #
+
+def null_values():
+
+    '''Function that returns the markers the Scorecard files use for
+    null or privacy-suppressed entries.'''
+
+    return list(load_schema()["null_values"])
+
+
+def get_dtypes(columns, table = "institution", overrides = None):
+
+    '''Function that returns a {column: dtype} mapping for the passed
+    columns of a Scorecard table ("institution" or "program").
+
+    `overrides` wins over the data dictionary, for columns whose documented
+    type does not match the published csv (e.g. text control labels).'''
+
+    overrides = overrides or {}
+
+    registry = load_schema()["columns"][table]
+
+    dtypes = {}
+
+    for col in columns:
+
+        if col in overrides:
+            dtypes[col] = overrides[col]
+
+        elif col in registry:
+            dtypes[col] = registry[col]["dtype"]
+
+        else:
+            raise KeyError(f"{col} is not in the {table} data dictionary")
+
+    return dtypes
+
+
+def get_suppressible(columns, table = "institution"):
+
+    '''Function that returns the passed columns of a Scorecard table
+    which can carry the `PrivacySuppressed` marker.'''
+
+    registry = load_schema()["columns"][table]
+
+    return [col for col in columns if col in registry and registry[col]["suppressible"]]
+
+
+def get_renames(columns = None):
+
+    '''Function that returns the friendly-name renames, optionally
+    limited to the passed columns.'''
+
+    if columns is None:
+        return dict(FRIENDLY_NAMES)
+
+    return {col: FRIENDLY_NAMES[col] for col in columns if col in FRIENDLY_NAMES}
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sklearn.feature_selection import RFE
+from sklearn.linear_model import LinearRegression
+
+import model
+
+
+def get_one_hot_data(n = 600, n_blocks = 5, n_numeric = 8, seed = 0):
+
+    '''Full one-hot blocks (no dropped level, as `get_dummy_dataframes` emits)
+    plus numeric columns; rank-deficient once centered.'''
+
+    rng = np.random.default_rng(seed)
+
+    cats = pd.DataFrame({f'cat{i}': rng.choice(list('abcdef'), n) for i in range(n_blocks)})
+    numeric = pd.DataFrame(rng.normal(size = (n, n_numeric)), columns = [f'num{i}' for i in range(n_numeric)])
+
+    X = pd.concat([pd.get_dummies(cats).astype(float), numeric], axis = 1)
+    y = X.to_numpy() @ rng.normal(size = X.shape[1]) + rng.normal(size = n)
+
+    return X, y
+
+
+@pytest.mark.parametrize('number_of_top_features', [1, 5, 10, 20])
+def test_rfe_matches_sklearn_on_one_hot(number_of_top_features):
+
+    X, y = get_one_hot_data()
+
+    ranks = model.recursive_feature_eliminate(X, y, number_of_top_features).set_index('Feature')['Ranking']
+
+    expected = RFE(LinearRegression(), n_features_to_select = number_of_top_features).fit(X, y).ranking_
+
+    np.testing.assert_array_equal(ranks[X.columns].to_numpy(), expected)
+
+
+def test_rfe_matches_sklearn_full_rank():
+
+    # one block with a dropped level: full rank, so only the downdate path runs
+    X, y = get_one_hot_data(n_blocks = 1)
+
+    X = X.drop(columns = 'cat0_a')
+
+    ranks = model.recursive_feature_eliminate(X, y, 3).set_index('Feature')['Ranking']
+
+    expected = RFE(LinearRegression(), n_features_to_select = 3).fit(X, y).ranking_
+
+    np.testing.assert_array_equal(ranks[X.columns].to_numpy(), expected)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+import prepare
+
+
+def get_fam_income_col(df, col_lst, new_col_string):
+
+    '''The original family income collapse: fillna(0), sum, drop members.'''
+
+    df[col_lst] = df[col_lst].fillna(0)
+
+    df[new_col_string] = df[col_lst].sum(axis = 1)
+
+    return df.drop(df[col_lst], axis = 1)
+
+
+def test_fam_income_columns_match_baseline():
+
+    rng = np.random.default_rng(0)
+
+    groups = prepare.COLUMN_FAMILIES['fam_income']['columns']
+    members = [col for cols in groups.values() for col in cols]
+
+    df = pd.DataFrame(rng.integers(0, 500, size = (200, len(members))).astype(float), columns = members)
+    df = df.mask(rng.random(df.shape) < 0.4)
+
+    # rows with a whole bracket missing
+    df.loc[:9, groups['income_0_30000']] = np.nan
+    df['unit_id_institution'] = np.arange(len(df))
+
+    expected = df.copy()
+    for new_col, cols in groups.items():
+        expected = get_fam_income_col(expected, cols, new_col)
+
+    result = prepare.collapse_column_families(df.copy(), ['fam_income'])
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_share_families_keep_all_missing_as_nan():
+
+    groups = prepare.COLUMN_FAMILIES['enrollment_share']['columns']
+    members = [col for cols in groups.values() for col in cols]
+
+    df = pd.DataFrame(0.1, index = range(3), columns = members)
+    df.loc[0, groups['enrollment_share_underrepresented']] = np.nan
+
+    result = prepare.collapse_column_families(df, ['enrollment_share'])
+
+    assert np.isnan(result.loc[0, 'enrollment_share_underrepresented'])
+    assert np.isclose(result.loc[1, 'enrollment_share_underrepresented'], 0.5)